@@ -1,10 +1,11 @@
 #!/usr/bin/env python3
 """
 Manuscript Build System - Professional Cross-Platform Build Tool
-Usage: python build.py [--last] [--profile NAME] [--list] [--source=FILE] [--frontmatter=FILE] [--png] [--si]
+Usage: python build.py [--last] [--incremental] [--profile NAME] [--list] [--source=FILE] [--frontmatter=FILE] [--png] [--si]
 """
 
-import subprocess
+import copy
+import functools
 import sys
 # Force UTF-8 output to fix Windows console crashes
 if sys.version_info >= (3, 7):
@@ -12,13 +13,20 @@ if sys.version_info >= (3, 7):
 import os
 import re
 import json
+import locale
+import hashlib
+import html
+import io
+import stat
 import shutil
-import urllib.request
-import urllib.error
+import threading
+import time
 import urllib.parse
-import xml.etree.ElementTree as ET
 from pathlib import Path
-from typing import Dict, Any, Optional, List, Tuple
+from typing import Callable, Dict, Any, Optional, List, Tuple, Union
+# subprocess, urllib.request, gzip, xml.etree and concurrent.futures are
+# imported where they are used, so --help, --list and the menus start
+# without loading them
 
 # --- Configuration ---
 # Determine script location for relative resource loading
@@ -30,11 +38,78 @@ SUPPINFO = "02_supp_info.md"
 PROFILES_DIR = SCRIPT_DIR / "profiles"
 BASE_PROFILE = SCRIPT_DIR / "profiles" / "_base.yaml"
 LUA_FILTER = SCRIPT_DIR / "pdf2png.lua"
-SI_HEADER = "_si_header.tex"
 EXPORT_DIR = "export"
 BUILD_CONFIG = ".build_config.json"
 DEFAULTS_CONFIG = ".defaults_config.json"
 CITATION_STYLES_DIR = SCRIPT_DIR / "citation_styles"
+CSL_VALIDATORS = CITATION_STYLES_DIR / ".etags.json"
+# Per-user cache for generated defaults, SI headers and scan results; never
+# the shared temp directory, since Pandoc runs the cached defaults as-is
+BUILD_CACHE_DIR = Path(
+    os.environ.get("LOCALAPPDATA" if os.name == "nt" else "XDG_CACHE_HOME")
+    or Path.home() / ("AppData/Local" if os.name == "nt" else ".cache")
+) / "md-manuscript"
+# Build cache entries are pruned past this age (seconds) and count
+BUILD_CACHE_MAX_AGE = 30 * 24 * 3600
+BUILD_CACHE_MAX_ENTRIES = 256
+# Fingerprints of outputs built with --incremental, by absolute output path
+OUTPUT_CACHE = BUILD_CACHE_DIR / "outputs.json"
+# Profiles refer to bundled files as "resources/..."; merged configs point
+# them at SCRIPT_DIR instead, with forward slashes so YAML/LaTeX accept them
+_RESOURCE_PREFIX = (str(SCRIPT_DIR).translate({ord("\\"): "/"}) + "/").encode("utf-8")
+
+# Profile ids containing any of these are listed under "Journals"
+JOURNAL_KEYWORDS = ("nature", "cell", "journal", "science", "pnas")
+
+# Cross-reference/e-mail prefixes that are not literature citations
+_EXCLUDED_CITATION_PREFIXES = ("@Fig", "@Tbl", "@email")
+
+# Precompiled patterns (used in per-file and per-line loops)
+_CSL_SAFE_RE = re.compile(r"[^a-zA-Z0-9_.-]+")
+_CSL_DASHES_RE = re.compile(r"-+")
+_INLINE_PARINDENT_RE = re.compile(r"`\\setlength\{\\parindent\}\{[^}]+\}`\{=latex\}")
+_RAW_LATEX_BLOCK_RE = re.compile(r"```\{=latex\}[\s\S]*?```")
+_FENCED_LATEX_DIV_RE = re.compile(r":::\s*\{=latex\}[\s\S]*?:::")
+_PARINDENT_IN_BLOCK_RE = re.compile(r"\\setlength\{\\parindent\}\{[^}]+\}")
+# Literature citation keys; the lookahead, built from the prefixes above,
+# skips excluded tokens inside the scan. Matched on bytes: keys are ASCII
+# and UTF-8 never hides an "@" inside a multi-byte character
+_CITATION_RE = re.compile(
+    rb"@(?!%s)[a-zA-Z][a-zA-Z0-9_:-]*"
+    % b"|".join(re.escape(p[1:]).encode("ascii") for p in _EXCLUDED_CITATION_PREFIXES)
+)
+_TRANSCLUSION_RE = re.compile(r"!\[\[(.*?)\]\]")
+_WIKILINK_RE = re.compile(r"\[\[(.*?)\]\]")
+_CALLOUT_RE = re.compile(rb"\[!(figure|table)\]")
+_FIG_LABEL_RE = re.compile(rb"#(fig:[a-zA-Z0-9_\-]+)")
+_TBL_LABEL_RE = re.compile(rb"#(tbl:[a-zA-Z0-9_\-]+)")
+# A csl: entry, either inline or followed by its indented value line
+_CSL_ENTRY_RE = re.compile(
+    r"^[ \t]*csl:(?:[ \t]*(?:\r?\n|\Z)(?:[ \t]+\S.*(?:\n|\Z))?|.*(?:\n|\Z))",
+    re.MULTILINE,
+)
+# First <title> inside <info>; CSL puts <info> at the top of the file
+_CSL_TITLE_RE = re.compile(rb"<info(?:\s[^>]*)?>[\s\S]*?<title(?:\s[^>]*)?>([^<]*)</title>")
+_JOURNAL_KEYWORDS_RE = re.compile("|".join(map(re.escape, JOURNAL_KEYWORDS)))
+# A profile: metadata block: the key line plus any following lines that are
+# indented by two spaces, blank, or another profile: line. A block that runs
+# to the end of the file also takes the newline in front of it.
+_PROFILE_BLOCK_LINE = rb"[ \t\r\x0b\x0c]*profile:[^\n]*"
+_PROFILE_BLOCK = (
+    _PROFILE_BLOCK_LINE
+    + rb"(?:\n(?:  [^\n]*|[ \t\r\x0b\x0c]*(?=\n|\Z)|" + _PROFILE_BLOCK_LINE + rb"))*"
+)
+_PROFILE_BLOCK_RE = re.compile(
+    rb"\n?^" + _PROFILE_BLOCK + rb"\Z|^" + _PROFILE_BLOCK + rb"\n", re.MULTILINE
+)
+# Pandoc escapes in markdown output that the garden undoes; an escaped
+# backslash is matched first so it is kept as is
+_PANDOC_UNESCAPE_RE = re.compile(r"\\\\|\\([\[\]_*])")
+# Relative link targets (markdown links/images, src attributes) that may
+# pull local files into an output
+_LOCAL_REF_RE = re.compile(r"\]\(<?([^)\s>]+)|\bsrc=[\"']([^\"']+)[\"']")
+# Variables dropped when a build strips the profile's fonts
+_FONT_VARIABLE_KEYS = ("mainfont:", "sansfont:", "monofont:")
 
 # Default settings when nothing is configured
 DEFAULT_SETTINGS = {
@@ -160,6 +235,16 @@ PARAGRAPH_STYLE_PRESETS = {
     "both": {"indent": True, "name": "Gap + Indent (Both)"},
 }
 
+# header-includes items injected for each paragraph style (without the
+# item indentation); "" (profile default) and unknown styles use the gap set
+_PARAGRAPH_GAP_ITEM = "- \\AtBeginDocument{\\setlength{\\parindent}{0pt}\\setlength{\\parskip}{0.5\\baselineskip}}\n"
+_PARAGRAPH_STYLE_ITEMS = {
+    "indent": ("- \\AtBeginDocument{\\setlength{\\parindent}{1.5em}\\setlength{\\parskip}{0pt}}\n",),
+    "both": ("- \\AtBeginDocument{\\setlength{\\parindent}{1.5em}\\setlength{\\parskip}{0.5\\baselineskip}}\n",),
+    "gap": ("- \\usepackage{parskip}\n", _PARAGRAPH_GAP_ITEM),
+}
+_PARAGRAPH_DEFAULT_ITEMS = (_PARAGRAPH_GAP_ITEM,)
+
 # Numbered headings presets
 NUMBERED_HEADINGS_PRESETS = {
     "on": {"value": True, "name": "Numbered"},
@@ -187,10 +272,17 @@ LANGUAGE_PRESETS = {
     "ja": "Japanese (日本語)",
 }
 
+# Menu orderings of the presets, materialized once
+_FONT_KEYS = tuple(FONT_PRESETS.keys())
+_SPACING_ITEMS = tuple(LINE_SPACING_PRESETS.items())
+_LANG_ITEMS = tuple(LANGUAGE_PRESETS.items())
+_FIG_FMT_ITEMS = tuple(FIGURE_FORMAT_PRESETS.items())
+_FIG_BG_ITEMS = tuple(FIGURE_BACKGROUND_PRESETS.items())
+
 
 def _safe_csl_filename(name: str) -> str:
-    safe = re.sub(r"[^a-zA-Z0-9_.-]+", "-", name.strip())
-    safe = re.sub(r"-+", "-", safe).strip("- ")
+    safe = _CSL_SAFE_RE.sub("-", name.strip())
+    safe = _CSL_DASHES_RE.sub("-", safe).strip("- ")
     if not safe:
         safe = "citation-style"
     if not safe.lower().endswith(".csl"):
@@ -199,12 +291,40 @@ def _safe_csl_filename(name: str) -> str:
 
 
 def _extract_csl_title(csl_path: Path) -> str:
+    stamp = _file_stamp(csl_path)
+    if stamp is None:
+        return csl_path.stem
+    return _extract_csl_title_cached(str(csl_path), stamp)
+
+
+@functools.lru_cache(maxsize=256)
+def _extract_csl_title_cached(csl_path_str: str, stamp: Tuple[int, int]) -> str:
+    csl_path = Path(csl_path_str)
+    # Fast path: the title sits in the header, so scan only the first 4 KB
+    try:
+        with open(csl_path, "rb") as f:
+            m = _CSL_TITLE_RE.search(f.read(4096))
+        if m and m.group(1):
+            return html.unescape(m.group(1).decode("utf-8")).strip()
+    except (OSError, UnicodeDecodeError):
+        pass
+
+    # Stream the XML and stop at the end of <info>, so large styles are never
+    # built into a full tree
     try:
-        tree = ET.parse(str(csl_path))
-        root = tree.getroot()
-        title_el = root.find('.//{*}info/{*}title')
-        if title_el is not None and title_el.text:
-            return title_el.text.strip()
+        import xml.etree.ElementTree as ET
+        in_info = False
+        with open(csl_path, "rb") as f:
+            for event, el in ET.iterparse(f, events=("start", "end")):
+                tag = el.tag.rpartition("}")[2]
+                if tag == "info":
+                    if event == "end":
+                        break
+                    in_info = True
+                elif in_info and event == "end" and tag == "title":
+                    if el.text and el.text.strip():
+                        return el.text.strip()
+                    break
     except Exception:
         pass
     return csl_path.stem
@@ -213,27 +333,136 @@ def _extract_csl_title(csl_path: Path) -> str:
 def list_local_csl_files() -> List[Tuple[str, str, str]]:
     """Return local CSL files as (key, name, path)."""
     ensure_citation_styles_dir()
+    return list(_local_csl_files(_file_stamp(CITATION_STYLES_DIR)))
+
+
+@functools.lru_cache(maxsize=4)
+def _local_csl_files(stamp: Optional[Tuple[int, int]]) -> Tuple[Tuple[str, str, str], ...]:
+    """(key, name, path) for each installed style, once per directory stamp.
+
+    Installing, removing or renaming a style (downloads land via os.replace)
+    changes the stamp, so the menus and --help only stat the directory.
+    """
     local = []
-    for csl in sorted(Path(CITATION_STYLES_DIR).glob('*.csl')):
-        key = csl.stem
-        name = _extract_csl_title(csl)
-        local.append((key, name, str(csl)))
-    return local
+    for filename in _scan_dir_names(CITATION_STYLES_DIR, stamp, ".csl"):
+        csl = CITATION_STYLES_DIR / filename
+        local.append((csl.stem, _extract_csl_title(csl), str(csl)))
+    return tuple(local)
 
 
-def download_csl_from_identifier(style_identifier: str) -> Optional[str]:
-    """Download CSL by Zotero style ID or URL. Returns path to CSL file."""
-    ensure_citation_styles_dir()
+@functools.lru_cache(maxsize=16)
+def _scan_dir_names(directory: Path, stamp: Optional[Tuple[int, int]], suffix: str) -> Tuple[str, ...]:
+    """Sorted names of regular files in `directory` ending with `suffix`.
 
-    identifier = style_identifier.strip()
-    if not identifier:
-        return None
+    Keyed on the directory stamp, which changes whenever an entry is added,
+    removed or renamed. os.scandir reports the entry type without an extra
+    stat per file.
+    """
+    if stamp is None:
+        return ()
+    try:
+        with os.scandir(directory) as it:
+            return tuple(sorted(
+                e.name for e in it if e.name.endswith(suffix) and e.is_file()
+            ))
+    except OSError:
+        return ()
+
+
+@functools.lru_cache(maxsize=1)
+def _url_opener():
+    """One opener shared by all downloads (including pooled worker threads)."""
+    import urllib.request
+    return urllib.request.build_opener()
+
+
+_DOWNLOAD_HEADERS = {"User-Agent": "Mozilla/5.0", "Accept-Encoding": "gzip"}
+
+
+def _open_url(url: str, headers: Optional[Dict[str, str]] = None):
+    """GET `url` through the shared opener and return the response.
+
+    urllib follows redirects and honours HTTP(S)_PROXY; failures raise
+    urllib.error.URLError/HTTPError (including 304 for a conditional
+    request via `headers`).
+    """
+    import urllib.request
+    request_headers = {**_DOWNLOAD_HEADERS, **headers} if headers else _DOWNLOAD_HEADERS
+    return _url_opener().open(urllib.request.Request(url, headers=request_headers), timeout=15)
+
+
+def _download_to_file(url: str, target: Path,
+                      headers: Optional[Dict[str, str]] = None) -> Dict[str, str]:
+    """Stream `url` into `target`, accepting a gzip-encoded response.
 
+    The body is copied in chunks to a sibling `.part` file and moved into
+    place once complete, so an interrupted download never leaves a
+    truncated style behind. Returns the response's cache validators
+    (etag / last_modified) for a later conditional request.
+    """
+    import gzip
+    # Per-thread suffix keeps concurrent downloads from sharing a .part file
+    partial = target.with_name(f"{target.name}.{os.getpid()}-{threading.get_ident()}.part")
+    try:
+        with _open_url(url, headers=headers) as response:
+            validators = {
+                key: value
+                for key, value in (("etag", response.headers.get("ETag")),
+                                   ("last_modified", response.headers.get("Last-Modified")))
+                if value
+            }
+            src = response
+            if response.headers.get("Content-Encoding", "").lower() == "gzip":
+                src = gzip.GzipFile(fileobj=response)
+            with open(partial, "wb") as f:
+                shutil.copyfileobj(src, f, length=64 * 1024)
+        os.replace(partial, target)
+    finally:
+        partial.unlink(missing_ok=True)
+    return validators
+
+
+# Guards read-modify-write of CSL_VALIDATORS from concurrent downloads
+_csl_validators_lock = threading.Lock()
+
+
+def _conditional_headers(filename: str) -> Dict[str, str]:
+    """Return If-None-Match/If-Modified-Since headers stored for a style file."""
+    entry = (_load_json_config(str(CSL_VALIDATORS)) or {}).get(filename)
+    if not isinstance(entry, dict):
+        return {}
+    headers = {}
+    if entry.get("etag"):
+        headers["If-None-Match"] = entry["etag"]
+    if entry.get("last_modified"):
+        headers["If-Modified-Since"] = entry["last_modified"]
+    return headers
+
+
+def _record_csl_validators(filename: str, validators: Dict[str, str]) -> None:
+    """Remember (or forget) the cache validators of a downloaded style."""
+    with _csl_validators_lock:
+        cache = _load_json_config(str(CSL_VALIDATORS))
+        if not isinstance(cache, dict):
+            cache = {}
+        if cache.get(filename) == (validators or None):
+            return
+        if validators:
+            cache[filename] = validators
+        else:
+            cache.pop(filename, None)
+        try:
+            _atomic_write(CSL_VALIDATORS, json.dumps(cache, indent=2, sort_keys=True))
+        except OSError:
+            pass
+
+
+def _csl_download_target(identifier: str) -> Tuple[str, Path]:
+    """Return (download URL, local target path) for a stripped style ID or URL."""
     url = identifier
     filename_hint = identifier
     if not (identifier.startswith('http://') or identifier.startswith('https://')):
         url = f"https://www.zotero.org/styles/{identifier}"
-        filename_hint = identifier
     else:
         try:
             parsed = urllib.parse.urlparse(identifier)
@@ -242,21 +471,46 @@ def download_csl_from_identifier(style_identifier: str) -> Optional[str]:
                 filename_hint = slug
         except Exception:
             pass
+    return url, CITATION_STYLES_DIR / _safe_csl_filename(filename_hint)
+
 
-    target = Path(CITATION_STYLES_DIR) / _safe_csl_filename(filename_hint)
-    if target.exists():
+def download_csl_from_identifier(style_identifier: str, refresh: bool = False) -> Optional[str]:
+    """Download CSL by Zotero style ID or URL. Returns path to CSL file.
+
+    An existing file is returned as is unless `refresh` is set; a refresh
+    sends the stored ETag/Last-Modified validators, so an unchanged style
+    costs a 304 and no write.
+    """
+    ensure_citation_styles_dir()
+
+    identifier = style_identifier.strip()
+    if not identifier:
+        return None
+
+    url, target = _csl_download_target(identifier)
+    exists = target.exists()
+    if exists and not refresh:
+        return str(target)
+    headers = _conditional_headers(target.name) if exists else None
+
+    import urllib.error
+
+    def _fetch(source_url: str, source: str = "") -> str:
+        try:
+            validators = _download_to_file(source_url, target, headers)
+        except urllib.error.HTTPError as e:
+            if e.code != 304:
+                raise
+            print(f"   ✓ {target.name} is up to date")
+        else:
+            _record_csl_validators(target.name, validators)
+            print(f"   ✓ Downloaded {target.name}{source}")
         return str(target)
 
     print(f"   Downloading citation style: {identifier}...")
     print(f"   URL: {url}")
     try:
-        req = urllib.request.Request(url, headers={"User-Agent": "Mozilla/5.0"})
-        with urllib.request.urlopen(req, timeout=15) as response:
-            csl_content = response.read()
-        with open(target, "wb") as f:
-            f.write(csl_content)
-        print(f"   ✓ Downloaded {target.name}")
-        return str(target)
+        return _fetch(url)
     except (urllib.error.URLError, urllib.error.HTTPError) as e:
         print(f"   Warning: Could not download citation style: {e}")
         # Try raw GitHub as fallback for style IDs
@@ -264,33 +518,160 @@ def download_csl_from_identifier(style_identifier: str) -> Optional[str]:
             github_url = f"https://raw.githubusercontent.com/citation-style-language/styles/master/{identifier}.csl"
             print(f"   Trying raw GitHub: {github_url}")
             try:
-                req = urllib.request.Request(github_url, headers={"User-Agent": "Mozilla/5.0"})
-                with urllib.request.urlopen(req, timeout=15) as response:
-                    csl_content = response.read()
-                with open(target, "wb") as f:
-                    f.write(csl_content)
-                print(f"   ✓ Downloaded {target.name} from GitHub")
-                return str(target)
+                return _fetch(github_url, " from GitHub")
             except Exception as e2:
                 print(f"   Raw GitHub also failed: {e2}")
+        # A failed refresh keeps the copy we already have
+        return str(target) if exists else None
+
+
+def download_csl_many(identifiers: List[str], max_workers: int = 8,
+                      refresh: bool = False) -> Dict[str, Optional[str]]:
+    """Download several CSL styles concurrently. Returns identifier -> path (or None).
+
+    With `refresh`, styles already on disk are revalidated too (see
+    download_csl_from_identifier).
+    """
+    results: Dict[str, Optional[str]] = {}
+    ensure_citation_styles_dir()
+    # Styles already on disk resolve without a worker thread
+    unique = []
+    for i in dict.fromkeys(i for i in identifiers if i and i.strip()):
+        target = _csl_download_target(i.strip())[1]
+        if not refresh and target.exists():
+            results[i] = str(target)
+        else:
+            unique.append(i)
+    if not unique:
+        return results
+
+    from concurrent.futures import ThreadPoolExecutor, as_completed
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(unique)))) as ex:
+        futures = {ex.submit(download_csl_from_identifier, i, refresh): i for i in unique}
+        for fut in as_completed(futures):
+            identifier = futures[fut]
+            try:
+                results[identifier] = fut.result()
+            except Exception as e:
+                print(f"   Warning: Could not download citation style {identifier}: {e}")
+                results[identifier] = None
+    return results
+
+
+def _file_stamp(path: Path) -> Optional[Tuple[int, int]]:
+    """Return (mtime_ns, size) used to key in-process caches, or None if missing."""
+    try:
+        st = path.stat()
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+@functools.lru_cache(maxsize=128)
+def _read_profile_text(path: str, stamp: Tuple[int, int]) -> str:
+    """Read a profile/defaults YAML once per (path, stamp)."""
+    return Path(path).read_text()
+
+
+def _find_variables_block(lines: List[str]) -> Optional[Tuple[int, int, int]]:
+    """Locate the first variables: block as (start index, indent, end index)."""
+    variables_idx = None
+    variables_indent = None
+    for i, line in enumerate(lines):
+        if line.strip() == "variables:":
+            variables_idx = i
+            variables_indent = len(line) - len(line.lstrip())
+            break
+
+    if variables_idx is None or variables_indent is None:
+        return None
+
+    end_idx = len(lines)
+    for j in range(variables_idx + 1, len(lines)):
+        candidate = lines[j]
+        stripped = candidate.strip()
+        if not stripped:
+            continue
+        indent = len(candidate) - len(candidate.lstrip())
+        if indent <= variables_indent and not stripped.startswith('#'):
+            end_idx = j
+            break
+
+    return variables_idx, variables_indent, end_idx
+
+
+@functools.lru_cache(maxsize=128)
+def _parse_profile_meta(path: str, stamp: Tuple[int, int]) -> Dict[str, Any]:
+    """Parse everything the build system needs from a profile/defaults YAML.
+
+    Cached on (path, stamp) so repeated lookups during one build (profile
+    listing, format detection, paragraph checks) never re-read the file.
+    """
+    return _profile_meta_from_text(_read_profile_text(path, stamp))
+
+
+def _profile_meta_from_text(content: str) -> Dict[str, Any]:
+    """Parse profile metadata and typography flags from YAML text."""
+    lines = content.splitlines(True)
+
+    meta: Dict[str, Any] = {
+        "name": None,
+        "description": None,
+        "format": None,
+        "fontsize": None,
+        "gap_paragraphs": False,
+        "uses_titlesec": r'\usepackage{titlesec}' in content and r'\titleformat{\paragraph}' in content,
+        "variables_block_span": _find_variables_block(lines),
+    }
+
+    # Single structured pass: track the current top-level key so profile
+    # metadata is read from the profile: block and typography from the
+    # direct children of variables:.
+    section = None
+    child_indent = None
+    for line in lines:
+        stripped = line.strip()
+        if not stripped or stripped.startswith("#"):
+            continue
+        indent = len(line) - len(line.lstrip())
+        if indent == 0:
+            section = stripped.split(":", 1)[0].strip()
+            child_indent = None
+            continue
+        if child_indent is None:
+            child_indent = indent
+        if indent != child_indent or ":" not in stripped:
+            continue
+
+        key, value = stripped.split(":", 1)
+        key = key.strip()
+        if section == "profile" and key in ("name", "description", "format"):
+            meta[key] = value.strip().strip('"\'')
+        elif section == "variables" and key == "fontsize":
+            meta["fontsize"] = value.split("#", 1)[0].strip().strip('"\'') or None
+        elif section == "variables" and key == "indent":
+            meta["gap_paragraphs"] = value.strip().lower() == "false"
+
+    return meta
+
+
+def _profile_meta(path: Path) -> Optional[Dict[str, Any]]:
+    """Return cached metadata for a YAML file, or None if it does not exist."""
+    stamp = _file_stamp(path)
+    if stamp is None:
         return None
+    return _parse_profile_meta(str(path), stamp)
 
 
 def get_profile_default_fontsize(profile: str) -> Optional[str]:
     """Extract fontsize from a profile YAML (best-effort)."""
-    profile_path = Path(PROFILES_DIR) / f"{profile}.yaml"
-    if not profile_path.exists():
-        return None
     try:
-        content = profile_path.read_text()
+        meta = _profile_meta(PROFILES_DIR / f"{profile}.yaml")
     except Exception:
         return None
-
-    # Look for a variables->fontsize entry.
-    m = re.search(r"^\s*fontsize\s*:\s*([^\n#]+)", content, re.MULTILINE)
-    if not m:
+    if not meta:
         return None
-    return m.group(1).strip().strip('"\'')
+    return meta["fontsize"]
 
 FONT_SIZES = ["9pt", "10pt", "11pt", "12pt", "13pt", "14pt", "15pt", "16pt"]
 
@@ -301,347 +682,341 @@ def get_profile_categories() -> Dict[str, List[str]]:
     Profiles are read from resources/profiles/*.yaml (excluding _base.yaml).
     Category is inferred from filename or profile metadata.
     """
+    cached = _profile_categories(_file_stamp(PROFILES_DIR))
+    return {k: list(v) for k, v in cached.items()}
+
+
+@functools.lru_cache(maxsize=8)
+def _profile_categories(stamp: Optional[Tuple[int, int]]) -> Dict[str, List[str]]:
     categories: Dict[str, List[str]] = {
         "General": [],
         "Thesis": [],
         "Journals": [],
     }
     
-    profiles_path = Path(PROFILES_DIR)
-    if not profiles_path.exists():
+    if stamp is None:
         return categories
     
-    for f in sorted(profiles_path.glob("*.yaml")):
-        if f.name.startswith('_'):
-            continue
-        
-        profile_id = f.stem
-        
-        # Infer category from profile name
-        if "thesis" in profile_id:
-            categories["Thesis"].append(profile_id)
-        elif any(x in profile_id for x in ["nature", "cell", "journal", "science", "pnas"]):
-            categories["Journals"].append(profile_id)
-        else:
-            categories["General"].append(profile_id)
+    for profile_id in _list_profiles(stamp):
+        categories[_profile_category(profile_id)].append(profile_id)
     
     # Remove empty categories
     return {k: v for k, v in categories.items() if v}
 
 
+def _profiles_by_category(fmt: Optional[str] = None) -> List[Tuple[str, List[Tuple[str, str, str]]]]:
+    """(category, [(profile, name, description), ...]) in menu order.
+
+    With `fmt`, only profiles of that output format are listed; categories
+    are kept even when none of their profiles match.
+    """
+    listing = []
+    for category, profiles in _profile_categories(_file_stamp(PROFILES_DIR)).items():
+        entries = []
+        for profile in profiles:
+            name, description, profile_fmt = get_profile_info(profile)
+            if fmt is None or profile_fmt == fmt:
+                entries.append((profile, name, description))
+        listing.append((category, entries))
+    return listing
+
+
+def _profile_category(profile_id: str) -> str:
+    """Infer category from profile name."""
+    if "thesis" in profile_id:
+        return "Thesis"
+    if _JOURNAL_KEYWORDS_RE.search(profile_id):
+        return "Journals"
+    return "General"
+
+
 def get_profile_info(profile_name: str) -> Tuple[str, str, str]:
     """Get profile display name, description, and format from profile file."""
-    profile_path = Path(PROFILES_DIR) / f"{profile_name}.yaml"
-    if not profile_path.exists():
+    meta = _profile_meta(PROFILES_DIR / f"{profile_name}.yaml")
+    if not meta:
         return profile_name, "", "pdf"
     
-    with open(profile_path, 'r') as f:
-        content = f.read()
-    
-    name = profile_name
-    description = ""
-    fmt = "pdf"
-    
-    for line in content.split('\n'):
-        line = line.strip()
-        if line.startswith('name:'):
-            name = line.split(':', 1)[1].strip().strip('"\'')
-        elif line.startswith('description:'):
-            description = line.split(':', 1)[1].strip().strip('"\'')
-        elif line.startswith('format:'):
-            fmt = line.split(':', 1)[1].strip().strip('"\'')
-    
+    name = meta["name"] if meta["name"] is not None else profile_name
+    description = meta["description"] if meta["description"] is not None else ""
+    fmt = meta["format"] if meta["format"] is not None else "pdf"
     return name, description, fmt
 
 
 def list_profiles() -> List[str]:
     """List all available profiles."""
-    profiles_path = Path(PROFILES_DIR)
-    if not profiles_path.exists():
-        return []
+    return sorted(_list_profiles(_file_stamp(PROFILES_DIR)))
+
+
+@functools.lru_cache(maxsize=8)
+def _list_profiles(stamp: Optional[Tuple[int, int]]) -> Tuple[str, ...]:
+    # The directory stamp changes whenever a profile is added or removed.
+    if stamp is None:
+        return ()
     
-    profiles = []
-    for f in profiles_path.glob("*.yaml"):
-        if not f.name.startswith('_'):
-            profiles.append(f.stem)
-    return sorted(profiles)
+    return tuple(
+        name[: -len(".yaml")]
+        for name in _scan_dir_names(PROFILES_DIR, stamp, ".yaml")
+        if not name.startswith('_')
+    )
+
+
+def _atomic_write(path: Union[str, Path], data: Union[str, bytes]) -> None:
+    """Write `data` (text or bytes) to a sibling temp file and move it over `path`.
+
+    Readers (and a crash mid-write) never see a half-written file. Bytes are
+    written unbuffered in a single call.
+    """
+    tmp = f"{path}.{os.getpid()}-{threading.get_ident()}.tmp"
+    try:
+        if isinstance(data, bytes):
+            with open(tmp, 'wb', buffering=0) as f:
+                f.write(data)
+        else:
+            with open(tmp, 'w') as f:
+                f.write(data)
+        os.replace(tmp, path)
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+
+
+@functools.lru_cache(maxsize=8)
+def _load_json_file(path: str, stamp: Tuple[int, int]) -> Any:
+    """Parse a JSON config file once per (path, stamp)."""
+    with open(path, 'r') as f:
+        return json.load(f)
+
+
+def _load_json_config(path: str) -> Optional[Any]:
+    """Return a private copy of a cached JSON config, or None if unavailable."""
+    stamp = _file_stamp(Path(path))
+    if stamp is None:
+        return None
+    try:
+        return copy.deepcopy(_load_json_file(path, stamp))
+    except Exception:
+        return None
 
 
 def load_last_config() -> Optional[Dict[str, Any]]:
     """Load the last build configuration."""
-    if Path(BUILD_CONFIG).exists():
-        try:
-            with open(BUILD_CONFIG, 'r') as f:
-                return json.load(f)
-        except Exception:
-            pass
-    return None
+    return _load_json_config(BUILD_CONFIG)
 
 
 def load_defaults() -> Dict[str, Any]:
     """Load default settings or return defaults if none exist."""
-    if Path(DEFAULTS_CONFIG).exists():
-        try:
-            with open(DEFAULTS_CONFIG, 'r') as f:
-                return json.load(f)
-        except Exception:
-            pass
+    defaults = _load_json_config(DEFAULTS_CONFIG)
+    if defaults is not None:
+        return defaults
     return DEFAULT_SETTINGS.copy()
 
 
 def save_defaults(defaults: Dict[str, Any]) -> None:
     """Save default settings to file."""
     try:
-        with open(DEFAULTS_CONFIG, 'w') as f:
-            json.dump(defaults, f, indent=2)
+        _atomic_write(DEFAULTS_CONFIG, json.dumps(defaults, indent=2))
     except Exception:
         pass
 
 
 def save_config(config: Dict[str, Any]):
     """Save build configuration for quick rebuild."""
-    with open(BUILD_CONFIG, 'w') as f:
-        json.dump(config, f, indent=2)
+    _atomic_write(BUILD_CONFIG, json.dumps(config, indent=2))
+
+
+def build_merged_defaults(base_path: str, profile_path: str) -> str:
+    """Return the merged base + profile defaults as text, without writing a file."""
+    return _merged_config_bytes(
+        str(base_path), _file_stamp(Path(base_path)),
+        str(profile_path), _file_stamp(Path(profile_path)),
+    ).decode(locale.getpreferredencoding(False))
+
 
+@functools.lru_cache(maxsize=32)
+def _merged_config_bytes(
+    base_path: str, base_stamp: Optional[Tuple[int, int]],
+    profile_path: str, profile_stamp: Optional[Tuple[int, int]],
+) -> bytes:
+    """Return the merged base + profile defaults as raw bytes.
 
-def merge_configs(base_path: str, profile_path: str) -> str:
-    """Merge base config with profile config, return path to merged config."""
-    temp_config = "_temp_config.yaml"
+    The merged text only depends on the two files, SCRIPT_DIR and this
+    script, so it is cached in BUILD_CACHE_DIR under a key derived from
+    their stamps and reused across runs while none of them change. Working
+    on bytes skips the decode/encode round-trip for content that is copied
+    through as is.
+    """
+    key = hashlib.blake2b(
+        f"{base_path}:{base_stamp}:{profile_path}:{profile_stamp}:{SCRIPT_DIR}:"
+        f"{_file_stamp(Path(__file__))}".encode("utf-8"),
+        digest_size=8,
+    ).hexdigest()
+    cache_file = BUILD_CACHE_DIR / f"merged_{key}.yaml"
+    try:
+        _build_cache_dir()
+        return cache_file.read_bytes()
+    except OSError:
+        pass
     
     # Read both files
-    base_content = ""
-    profile_content = ""
+    base_content = b""
+    profile_content = b""
     
     # Rewrite "resources/" paths to absolute SCRIPT_DIR paths
     # This ensures resources are found even if the script/resources are moved (e.g. to a plugin folder)
-    resource_replacement = str(SCRIPT_DIR).replace("\\", "/") + "/"
+    if base_stamp is not None:
+        base_content = Path(base_path).read_bytes().replace(b"resources/", _RESOURCE_PREFIX)
     
-    if Path(base_path).exists():
-        with open(base_path, 'r') as f:
-            base_content = f.read().replace("resources/", resource_replacement)
-    
-    if Path(profile_path).exists():
-        with open(profile_path, 'r') as f:
-            profile_content = f.read().replace("resources/", resource_replacement)
+    if profile_stamp is not None:
+        profile_content = Path(profile_path).read_bytes().replace(b"resources/", _RESOURCE_PREFIX)
     
     # Filter out profile metadata from profile content
-    filtered_lines = []
-    skip_profile_block = False
-    for line in profile_content.split('\n'):
-        if line.strip().startswith('profile:'):
-            skip_profile_block = True
-            continue
-        if skip_profile_block:
-            if line.startswith('  ') or line.strip() == '':
-                continue
-            else:
-                skip_profile_block = False
-        filtered_lines.append(line)
+    profile_content = _PROFILE_BLOCK_RE.sub(b"", profile_content)
+    merged = b"".join((base_content, b"\n\n# --- Profile Overrides ---\n", profile_content))
     
-    profile_content = '\n'.join(filtered_lines)
-    
-    # Write merged config (profile overrides base)
-    with open(temp_config, 'w') as f:
-        f.write(base_content)
-        f.write("\n\n# --- Profile Overrides ---\n")
-        f.write(profile_content)
+    try:
+        _build_cache_dir()
+        _atomic_write(cache_file, merged)
+    except OSError:
+        pass
     
-    return temp_config
+    return merged
 
 
-def strip_csl_from_defaults_file(defaults_path: str) -> None:
-    """Remove any csl setting from a Pandoc defaults YAML file.
+def _rewrite_defaults_text(
+    text: str,
+    meta: Dict[str, Any],
+    strip_fonts: bool = False,
+    strip_csl: bool = False,
+    overrides: Optional[Dict[str, Any]] = None,
+) -> str:
+    """Return defaults `text` with font stripping, overrides and csl removal applied.
 
-    We do this so a user-selected CSL can be provided via metadata without
-    triggering Pandoc's "--csl option can only be used once" error.
+    `meta` is the parsed metadata of `text` (see _profile_meta_from_text).
+    Variables-block and header-includes edits share one line list, so the
+    text is split and joined once however many rewrites are requested.
+    `overrides` maps the _OVERRIDE_PLAN_KEYS plus linenumbers and
+    pagenumbers to their values and is skipped when None.
     """
-    path = Path(defaults_path)
-    if not path.exists():
-        return
-
-    lines = path.read_text().splitlines(True)
-    out: List[str] = []
-    skip_next_csl_value_line = False
-
-    for line in lines:
-        stripped = line.strip()
-
-        if skip_next_csl_value_line:
-            # If the previous line was "csl:" with no inline value, remove the
-            # first indented value line (e.g. "  resources/foo.csl").
-            if stripped and (line.startswith(' ') or line.startswith('\t')):
-                skip_next_csl_value_line = False
-                continue
-            skip_next_csl_value_line = False
-
-        # Matches both top-level "csl:" and nested metadata "csl:" entries.
-        if stripped.startswith('csl:'):
-            # If it is just "csl:" with no inline value, also skip the next
-            # indented value line.
-            if stripped == 'csl:':
-                skip_next_csl_value_line = True
-            continue
-
-        out.append(line)
-
-    path.write_text(''.join(out))
-
-
-def strip_font_variables_from_defaults_file(defaults_path: str) -> None:
-    path = Path(defaults_path)
-    if not path.exists():
-        return
-
-    lines = path.read_text().splitlines(True)
-
-    variables_idx = None
-    variables_indent = None
-    for i, line in enumerate(lines):
-        if line.strip() == "variables:":
-            variables_idx = i
-            variables_indent = len(line) - len(line.lstrip())
-            break
-
-    if variables_idx is None or variables_indent is None:
-        return
-
-    end_idx = len(lines)
-    for j in range(variables_idx + 1, len(lines)):
-        candidate = lines[j]
-        stripped = candidate.strip()
-        if not stripped:
-            continue
-        indent = len(candidate) - len(candidate.lstrip())
-        if indent <= variables_indent and not stripped.startswith('#'):
-            end_idx = j
-            break
-
-    keys_to_remove = {"mainfont:", "sansfont:", "monofont:"}
-    new_block: List[str] = []
-    for line in lines[variables_idx + 1 : end_idx]:
-        stripped = line.strip()
-        if any(stripped.startswith(k) for k in keys_to_remove):
-            continue
-        new_block.append(line)
-
-    out = []
-    out.extend(lines[: variables_idx + 1])
-    out.extend(new_block)
-    out.extend(lines[end_idx:])
-    path.write_text(''.join(out))
-
-
-def convert_tex_file_to_body_only(tex_path: str) -> None:
-    path = Path(tex_path)
-    if not path.exists():
-        return
-
-    text = path.read_text()
-
-    begin = "\\begin{document}"
-    end = "\\end{document}"
-
-    begin_idx = text.find(begin)
-    end_idx = text.rfind(end)
+    uses_titlesec = meta["uses_titlesec"]
+    if overrides is not None and not (
+        uses_titlesec or any(v is not None and v != "" for v in overrides.values())
+    ):
+        overrides = None
+
+    # Without a variables block there is nowhere to inject (all PDF profiles
+    # currently have one, but keep this defensive).
+    span = meta["variables_block_span"]
+    if span is not None and (strip_fonts or overrides is not None):
+        lines = text.splitlines(True)
+        variables_idx, variables_indent, end_idx = span
+
+        keys_to_remove: Tuple[str, ...] = _FONT_VARIABLE_KEYS if strip_fonts else ()
+        override_lines: List[str] = []
+        if overrides is not None:
+            # Remove existing keys we're overriding inside the variables
+            # block, then add the override lines at its child indentation.
+            override_keys, override_entries = _build_override_plan(
+                *map(overrides.get, _OVERRIDE_PLAN_KEYS)
+            )
+            keys_to_remove += override_keys
+            child_indent_str = " " * (variables_indent + 2)
+            override_lines = [child_indent_str + entry for entry in override_entries]
+
+        out = lines[: variables_idx + 1]
+        out.extend(override_lines)
+        out.extend(
+            line for line in lines[variables_idx + 1 : end_idx]
+            if not line.strip().startswith(keys_to_remove)
+        )
+        out.extend(lines[end_idx:])
+
+        if overrides is not None:
+            linenumbers = overrides.get("linenumbers")
+            pagenumbers = overrides.get("pagenumbers")
+            paragraph_style = overrides.get("paragraph_style")
+            if linenumbers is not None:
+                out = _apply_linenumbers_override(out, linenumbers)
+
+            # Also handle titlesec conflicts even if no explicit paragraph
+            # style is set ("" stands for the profile default).
+            if paragraph_style or uses_titlesec:
+                # None of the override or injection lines carry these
+                # markers, so one substring search over the original text
+                # decides whether the per-line strip pass has anything to remove.
+                needs_strip = "parindent" in text or "parskip" in text or (
+                    uses_titlesec and r"\renewcommand{" in text and "paragraph}" in text
+                )
+                out = _apply_paragraph_style_override(
+                    out, paragraph_style or "", uses_titlesec, needs_strip
+                )
+
+            if pagenumbers is not None:
+                out = _apply_pagenumbers_override(out, pagenumbers)
+
+        text = "".join(out)
+
+    if strip_csl:
+        # Matches both top-level "csl:" and nested metadata "csl:" entries. A
+        # bare "csl:" also takes the indented value line below it
+        # (e.g. "  resources/foo.csl").
+        text = _CSL_ENTRY_RE.sub("", text)
+    return text
+
+
+def _latex_body(tex: bytes) -> Optional[bytes]:
+    """Return what lies between \\begin{document} and \\end{document}, or None."""
+    begin = b"\\begin{document}"
+    begin_idx = tex.find(begin)
+    end_idx = tex.rfind(b"\\end{document}")
     if begin_idx == -1 or end_idx == -1 or end_idx <= begin_idx:
-        return
-
-    body = text[begin_idx + len(begin) : end_idx]
-    body = body.lstrip("\r\n")
-    body = body.rstrip() + "\n"
-    path.write_text(body)
-
-
-def apply_font_overrides_to_defaults_file(
-    defaults_path: str,
-    font: Optional[str] = None,
-    fontsize: Optional[str] = None,
-    linespacing: Optional[str] = None,
-    paragraph_style: Optional[str] = None,
-    linenumbers: Optional[bool] = None,
-    pagenumbers: Optional[bool] = None,
-    numbered_headings: Optional[bool] = None,
-    language: Optional[str] = None,
-    papersize: Optional[str] = None,
-    margin_top: Optional[str] = None,
-    margin_bottom: Optional[str] = None,
-    margin_left: Optional[str] = None,
-    margin_right: Optional[str] = None,
-) -> None:
-    """Apply font/fontsize/linespacing/paragraph style/headings/language overrides to Pandoc defaults file.
-
-    This avoids situations where multiple settings (from profile + CLI)
-    end up concatenated in the generated LaTeX.
+        return None
+    body = tex[begin_idx + len(begin) : end_idx]
+    return body.lstrip(b"\r\n").rstrip() + b"\n"
+
+
+# Override keys in _build_override_plan's argument order
+_OVERRIDE_PLAN_KEYS = (
+    "font", "fontsize", "linespacing", "paragraph_style", "numbered_headings",
+    "language", "papersize", "margin_top", "margin_bottom", "margin_left", "margin_right",
+)
+
+
+@functools.lru_cache(maxsize=32)
+def _build_override_plan(
+    font: Optional[str],
+    fontsize: Optional[str],
+    linespacing: Optional[str],
+    paragraph_style: Optional[str],
+    numbered_headings: Optional[bool],
+    language: Optional[str],
+    papersize: Optional[str],
+    margin_top: Optional[str],
+    margin_bottom: Optional[str],
+    margin_left: Optional[str],
+    margin_right: Optional[str],
+) -> Tuple[Tuple[str, ...], Tuple[str, ...]]:
+    """Return (keys to remove, unindented override lines) for a set of flags.
+
+    Depends only on the flags, so it is computed once per flag set and shared
+    by every defaults file built with them.
     """
-    # Check if we have explicit overrides or titlesec conflicts
-    has_explicit_overrides = any([font, fontsize, linespacing, paragraph_style, linenumbers is not None, pagenumbers is not None, numbered_headings is not None, language, papersize, margin_top, margin_bottom, margin_left, margin_right])
-    has_titlesec_conflict = _profile_uses_titlesec_paragraph(defaults_path)
-    
-    if not (has_explicit_overrides or has_titlesec_conflict):
-        return
-
-    path = Path(defaults_path)
-    if not path.exists():
-        return
-
-    lines = path.read_text().splitlines(True)
-
-    # Locate the first variables: block.
-    variables_idx = None
-    variables_indent = None
-    for i, line in enumerate(lines):
-        if line.strip() == "variables:":
-            variables_idx = i
-            variables_indent = len(line) - len(line.lstrip())
-            break
-            
-    if variables_idx is not None:
-        print(f"DEBUG: Found variables block at line {variables_idx}")
-
-    # If there's no variables block, we can't safely inject (all PDF profiles
-    # currently have it, but keep this defensive).
-    if variables_idx is None or variables_indent is None:
-        return
-
-    child_indent_str = " " * (variables_indent + 2)
-
-    # Determine end of variables block.
-    end_idx = len(lines)
-    for j in range(variables_idx + 1, len(lines)):
-        candidate = lines[j]
-        stripped = candidate.strip()
-        if not stripped:
-            continue
-        indent = len(candidate) - len(candidate.lstrip())
-        if indent <= variables_indent and not stripped.startswith('#'):
-            end_idx = j
-            break
-
-    # Remove existing keys we're overriding inside the variables block.
-    keys_to_remove = set()
+    keys_to_remove: List[str] = []
     if font:
-        keys_to_remove.update({"mainfont:", "sansfont:", "monofont:"})
+        keys_to_remove.extend(_FONT_VARIABLE_KEYS)
     if fontsize:
-        keys_to_remove.add("fontsize:")
+        keys_to_remove.append("fontsize:")
     if linespacing:
-        keys_to_remove.add("linestretch:")
+        keys_to_remove.append("linestretch:")
     if paragraph_style:
-        keys_to_remove.add("indent:")
+        keys_to_remove.append("indent:")
     if numbered_headings is not None:
-        keys_to_remove.add("numbersections:")
+        keys_to_remove.append("numbersections:")
     if language:
-        keys_to_remove.add("lang:")
+        keys_to_remove.append("lang:")
     if papersize:
-        keys_to_remove.add("papersize:")
+        keys_to_remove.append("papersize:")
     if any([margin_top, margin_bottom, margin_left, margin_right]):
-        keys_to_remove.add("geometry:")
-    
-    new_block: List[str] = []
-    for line in lines[variables_idx + 1 : end_idx]:
-        stripped = line.strip()
-        if any(stripped.startswith(k) for k in keys_to_remove):
-            continue
-        new_block.append(line)
+        keys_to_remove.append("geometry:")
 
     # Build override lines.
     override_lines: List[str] = []
@@ -650,268 +1025,151 @@ def apply_font_overrides_to_defaults_file(
         if all(k in font_info for k in ("mainfont", "sansfont", "monofont")):
             override_lines.extend(
                 [
-                    f"{child_indent_str}mainfont: \"{font_info['mainfont']}\"\n",
-                    f"{child_indent_str}sansfont: \"{font_info['sansfont']}\"\n",
-                    f"{child_indent_str}monofont: \"{font_info['monofont']}\"\n",
+                    f"mainfont: \"{font_info['mainfont']}\"\n",
+                    f"sansfont: \"{font_info['sansfont']}\"\n",
+                    f"monofont: \"{font_info['monofont']}\"\n",
                 ]
             )
     if fontsize:
-        override_lines.append(f"{child_indent_str}fontsize: {fontsize}\n")
+        override_lines.append(f"fontsize: {fontsize}\n")
     if linespacing and linespacing in LINE_SPACING_PRESETS:
         spacing_value = LINE_SPACING_PRESETS[linespacing]["value"]
-        override_lines.append(f"{child_indent_str}linestretch: {spacing_value}\n")
+        override_lines.append(f"linestretch: {spacing_value}\n")
     if paragraph_style and paragraph_style in PARAGRAPH_STYLE_PRESETS:
         indent_value = "true" if PARAGRAPH_STYLE_PRESETS[paragraph_style]["indent"] else "false"
-        override_lines.append(f"{child_indent_str}indent: {indent_value}\n")
+        override_lines.append(f"indent: {indent_value}\n")
     if numbered_headings is not None:
-        override_lines.append(f"{child_indent_str}numbersections: {'true' if numbered_headings else 'false'}\n")
+        override_lines.append(f"numbersections: {'true' if numbered_headings else 'false'}\n")
     if language and language in LANGUAGE_PRESETS:
-        override_lines.append(f"{child_indent_str}lang: {language}\n")
+        override_lines.append(f"lang: {language}\n")
     if papersize and papersize in PAPER_SIZE_PRESETS:
-        override_lines.append(f"{child_indent_str}papersize: {papersize}\n")
+        override_lines.append(f"papersize: {papersize}\n")
     if any([margin_top, margin_bottom, margin_left, margin_right]):
-        override_lines.append(f"{child_indent_str}geometry:\n")
+        override_lines.append("geometry:\n")
         if margin_top:
-            override_lines.append(f"{child_indent_str}  - top={margin_top}\n")
+            override_lines.append(f"  - top={margin_top}\n")
         if margin_bottom:
-            override_lines.append(f"{child_indent_str}  - bottom={margin_bottom}\n")
+            override_lines.append(f"  - bottom={margin_bottom}\n")
         if margin_left:
-            override_lines.append(f"{child_indent_str}  - left={margin_left}\n")
+            override_lines.append(f"  - left={margin_left}\n")
         if margin_right:
-            override_lines.append(f"{child_indent_str}  - right={margin_right}\n")
-
-    # Write back file: keep everything, but replace variables block content.
-    out = []
-    out.extend(lines[: variables_idx + 1])
-    out.extend(override_lines)
-    out.extend(new_block)
-    out.extend(lines[end_idx:])
-    
-    path.write_text(''.join(out))
-    
-    # Handle line numbers - need to modify header-includes
-    if linenumbers is not None:
-        _apply_linenumbers_override(defaults_path, linenumbers)
-    
-    # Handle paragraph style - need to modify parindent/parskip in header-includes
-    # Also handle titlesec conflicts even if no explicit paragraph style is set
-    uses_titlesec = _profile_uses_titlesec_paragraph(defaults_path)
-    if paragraph_style or uses_titlesec:
-        # If no explicit style, use empty string to indicate "profile default"
-        effective_style = paragraph_style if paragraph_style else ""
-        _apply_paragraph_style_override(defaults_path, effective_style)
-    
-    # Handle page numbers - need to modify header-includes
-    if pagenumbers is not None:
-        _apply_pagenumbers_override(defaults_path, pagenumbers)
+            override_lines.append(f"  - right={margin_right}\n")
 
+    return tuple(keys_to_remove), tuple(override_lines)
 
-def _apply_linenumbers_override(defaults_path: str, enable: bool) -> None:
-    r"""Add or remove \linenumbers from header-includes inside variables block."""
-    path = Path(defaults_path)
-    if not path.exists():
-        return
-    
-    content = path.read_text()
-    lines = content.splitlines(True)
-    
-    # First, remove any existing lineno-related lines
-    new_lines = []
-    for line in lines:
-        if r'\usepackage{lineno}' in line or r'\linenumbers' in line:
-            continue
-        new_lines.append(line)
-    
-    if enable:
-        # Add \usepackage{lineno} and \linenumbers to header-includes inside variables block
-        result_lines = []
-        in_variables = False
-        in_header_includes = False
-        added = False
-        
-        for line in new_lines:
-            result_lines.append(line)
-            stripped = line.strip()
-            indent = len(line) - len(line.lstrip())
-            
-            if stripped == "variables:":
-                in_variables = True
-            elif in_variables and stripped == "header-includes:":
-                in_header_includes = True
-            elif in_header_includes and not added:
-                if stripped.startswith("- "):
-                    item_indent = indent
-                    indent_str = " " * item_indent
-                    # Add both usepackage and linenumbers command
-                    result_lines.insert(-1, f"{indent_str}- \\usepackage{{lineno}}\n")
-                    result_lines.insert(-1, f"{indent_str}- \\linenumbers\n")
-                    added = True
-                    in_header_includes = False
-        
-        if added:
-            path.write_text(''.join(result_lines))
-    else:
-        # Just write back the file with lineno lines removed
-        path.write_text(''.join(new_lines))
 
+def _inject_header_includes(
+    lines: List[str], drop: Tuple[str, ...], injections: List[str]
+) -> List[str]:
+    """Drop lines containing any of `drop` and inject items into header-includes.
 
-def _apply_pagenumbers_override(defaults_path: str, enable: bool) -> None:
-    """Add or remove page numbering from header-includes inside variables block."""
-    path = Path(defaults_path)
-    if not path.exists():
-        return
-    
-    content = path.read_text()
-    lines = content.splitlines(True)
-    
-    # First, remove any existing page numbering related lines
-    new_lines = []
-    for line in lines:
-        if r'\pagenumbering{gobble}' in line or r'\pagenumbering{arabic}' in line:
-            continue
-        new_lines.append(line)
-    
-    # If disabling page numbers, add \pagenumbering{gobble}
-    # If enabling explicitly, add \pagenumbering{arabic}
+    Injected items go in front of the first header-includes entry inside the
+    variables block, using that entry's indentation. Lines are emitted into a
+    fresh list in one pass, so no mid-list inserts are needed.
+    """
     result_lines = []
     in_variables = False
     in_header_includes = False
-    added = False
+    added = not injections
     
-    for line in new_lines:
-        result_lines.append(line)
+    for line in lines:
+        if any(marker in line for marker in drop):
+            continue
+        if added:
+            # Injection done; the rest only needs filtering
+            result_lines.append(line)
+            continue
         stripped = line.strip()
-        indent = len(line) - len(line.lstrip())
         
         if stripped == "variables:":
             in_variables = True
         elif in_variables and stripped == "header-includes:":
             in_header_includes = True
-        elif in_header_includes and not added:
-            if stripped.startswith("- "):
-                item_indent = indent
-                indent_str = " " * item_indent
-                injection = r"\pagenumbering{arabic}" if enable else r"\pagenumbering{gobble}"
-                result_lines.insert(-1, f"{indent_str}- {injection}\n")
-                added = True
-                in_header_includes = False
-    
-    if added:
-        path.write_text(''.join(result_lines))
-    else:
-        path.write_text(''.join(new_lines))
+        elif in_header_includes and stripped.startswith("- "):
+            indent_str = " " * (len(line) - len(line.lstrip()))
+            result_lines.extend(f"{indent_str}- {item}\n" for item in injections)
+            added = True
+            in_header_includes = False
+        result_lines.append(line)
+    
+    return result_lines
 
 
-def _normalize_inline_parindent_for_gap(markdown_path: str) -> None:
-    path = Path(markdown_path)
-    if not path.exists():
-        return
+def _apply_linenumbers_override(lines: List[str], enable: bool) -> List[str]:
+    r"""Add or remove \linenumbers from header-includes inside variables block."""
+    # Remove any existing lineno-related lines; when enabling, add both
+    # \usepackage{lineno} and \linenumbers in front of the first item
+    injections = [r"\usepackage{lineno}", r"\linenumbers"] if enable else []
+    return _inject_header_includes(
+        lines, (r'\usepackage{lineno}', r'\linenumbers'), injections
+    )
+
 
-    content = path.read_text()
+def _apply_pagenumbers_override(lines: List[str], enable: bool) -> List[str]:
+    """Add or remove page numbering from header-includes inside variables block."""
+    # If disabling page numbers, add \pagenumbering{gobble}
+    # If enabling explicitly, add \pagenumbering{arabic}
+    injection = r"\pagenumbering{arabic}" if enable else r"\pagenumbering{gobble}"
+    return _inject_header_includes(
+        lines, (r'\pagenumbering{gobble}', r'\pagenumbering{arabic}'), [injection]
+    )
 
-    content = re.sub(
-        r"`\\setlength\{\\parindent\}\{[^}]+\}`\{=latex\}",
+
+def _normalize_inline_parindent_text(content: str) -> str:
+    """Force \\parindent to 0pt in inline and raw LaTeX of a markdown text."""
+    if "parindent" not in content:
+        return content
+
+    content = _INLINE_PARINDENT_RE.sub(
         r"`\\setlength{\\parindent}{0pt}`{=latex}",
         content,
     )
 
     def _rewrite_raw_latex_block(match: re.Match) -> str:
         block = match.group(0)
-        return re.sub(
-            r"\\setlength\{\\parindent\}\{[^}]+\}",
+        return _PARINDENT_IN_BLOCK_RE.sub(
             r"\\setlength{\\parindent}{0pt}",
             block,
         )
 
-    content = re.sub(
-        r"```\{=latex\}[\s\S]*?```",
-        _rewrite_raw_latex_block,
-        content,
-    )
-
-    content = re.sub(
-        r":::\s*\{=latex\}[\s\S]*?:::",
-        _rewrite_raw_latex_block,
-        content,
-    )
-    path.write_text(content)
+    content = _RAW_LATEX_BLOCK_RE.sub(_rewrite_raw_latex_block, content)
+    return _FENCED_LATEX_DIV_RE.sub(_rewrite_raw_latex_block, content)
 
 
-def _profile_uses_gap_paragraphs(defaults_path: str) -> bool:
-    path = Path(defaults_path)
-    if not path.exists():
-        return False
-
-    lines = path.read_text().splitlines()
-    in_variables = False
-    for line in lines:
-        stripped = line.strip()
-        if stripped == "variables:":
-            in_variables = True
-            continue
-        if in_variables and stripped and not stripped.startswith("#"):
-            indent = len(line) - len(line.lstrip())
-            if indent == 0:
-                in_variables = False
-                continue
-            if stripped.startswith("indent:"):
-                value = stripped.split(":", 1)[1].strip().lower()
-                return value == "false"
-    return False
-
-
-def _profile_uses_titlesec_paragraph(defaults_path: str) -> bool:
-    """Check if profile uses titlesec package for paragraph formatting."""
-    path = Path(defaults_path)
-    if not path.exists():
-        return False
-    
-    content = path.read_text()
-    return r'\usepackage{titlesec}' in content and r'\titleformat{\paragraph}' in content
-
-
-def _apply_paragraph_style_override(defaults_path: str, style: str) -> None:
+def _apply_paragraph_style_override(
+    lines: List[str], style: str, uses_titlesec: bool, needs_strip: bool = True
+) -> List[str]:
     """Modify parindent/parskip in header-includes inside variables block.
     
     Adds settings at END of header-includes to ensure they override profile defaults.
     Also removes conflicting \renewcommand{\paragraph} when titlesec is used.
+    Pass needs_strip=False when the text is known to hold none of those lines.
     """
-    path = Path(defaults_path)
-    if not path.exists():
-        return
-    
-    content = path.read_text()
-    lines = content.splitlines(True)
-    
-    # Check if this profile uses titlesec for paragraph formatting
-    uses_titlesec = _profile_uses_titlesec_paragraph(defaults_path)
-    
-    # Remove existing parindent/parskip lines and conflicting paragraph commands
-    new_lines = []
-    for line in lines:
-        if r'\setlength{\parindent}' in line or r'\setlength{\parskip}' in line:
-            continue
-        if r'\AtBeginDocument' in line and (r'\parindent' in line or r'\parskip' in line):
-            continue
-        if r'\usepackage{parskip}' in line:
-            continue
-        # Remove conflicting \renewcommand{\paragraph} when titlesec is used
-        if uses_titlesec and r'\renewcommand{\paragraph}' in line:
-            continue
-        if uses_titlesec and r'\renewcommand{\subparagraph}' in line:
-            continue
-        new_lines.append(line)
-    
-    # Find the LAST item in header-includes inside variables block
-    # and add our settings AFTER it (at end of header-includes)
+    # One forward pass: drop existing parindent/parskip lines and conflicting
+    # paragraph commands, and track the LAST item in header-includes inside
+    # the variables block so our settings go AFTER it (at end of
+    # header-includes). The structure is tracked on kept lines only.
+    new_lines: List[str] = []
     in_variables = False
     in_header_includes = False
     last_header_item_idx = -1
     item_indent = 4  # default
     
-    for i, line in enumerate(new_lines):
-        stripped = line.strip()
-        indent = len(line) - len(line.lstrip())
+    # No early exit: merged defaults can hold a later header-includes block
+    # (base + profile), and the injection belongs after its last item.
+    for line in lines:
+        if needs_strip and (
+            r'\setlength{\parindent}' in line or r'\setlength{\parskip}' in line
+            or (r'\AtBeginDocument' in line and (r'\parindent' in line or r'\parskip' in line))
+            or r'\usepackage{parskip}' in line
+            # Remove conflicting \renewcommand{\paragraph} when titlesec is used
+            or (uses_titlesec and (
+                r'\renewcommand{\paragraph}' in line or r'\renewcommand{\subparagraph}' in line
+            ))
+        ):
+            continue
+        body = line.lstrip()
+        stripped = body.rstrip()
         
         if stripped == "variables:":
             in_variables = True
@@ -919,41 +1177,314 @@ def _apply_paragraph_style_override(defaults_path: str, style: str) -> None:
             in_header_includes = True
         elif in_header_includes:
             if stripped.startswith("- "):
-                last_header_item_idx = i
-                item_indent = indent
-            elif stripped and not stripped.startswith("#") and not stripped.startswith("-") and not stripped.startswith("|"):
+                last_header_item_idx = len(new_lines)
+                item_indent = len(line) - len(body)
+            elif stripped and not stripped.startswith(("#", "-", "|")):
                 # End of header-includes block (new key at same or lower indent)
-                if indent <= item_indent - 2:
+                if len(line) - len(body) <= item_indent - 2:
                     in_header_includes = False
+        new_lines.append(line)
     
     if last_header_item_idx > 0:
         indent_str = " " * item_indent
-        if style == "indent":
-            injection = r"\AtBeginDocument{\setlength{\parindent}{1.5em}\setlength{\parskip}{0pt}}"
-        elif style == "both":
-            injection = r"\AtBeginDocument{\setlength{\parindent}{1.5em}\setlength{\parskip}{0.5\baselineskip}}"
-        else:
-            injection = r"\AtBeginDocument{\setlength{\parindent}{0pt}\setlength{\parskip}{0.5\baselineskip}}"
+        items = _PARAGRAPH_STYLE_ITEMS.get(style, _PARAGRAPH_DEFAULT_ITEMS)
+        split = last_header_item_idx + 1
+        new_lines[split:split] = [indent_str + item for item in items]
+        return new_lines
+    
+    return lines
+
+
+def _defaults_cache_key(profile_path: str, options: Dict[str, Any]) -> str:
+    """Hash everything that determines the final defaults file for a build."""
+    payload = {
+        "options": options,
+        "base": _file_stamp(BASE_PROFILE),
+        "profile": _file_stamp(Path(profile_path)),
+        "script": _file_stamp(Path(__file__)),
+        "script_dir": str(SCRIPT_DIR),
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def prepare_defaults_file(
+    profile: str,
+    strip_fonts: bool = False,
+    overrides: Optional[Dict[str, Any]] = None,
+    temp_config: Optional[str] = "_temp_config.yaml",
+    extra_yaml: str = "",
+    strip_csl: bool = False,
+) -> Tuple[str, bool, bool]:
+    """Write the merged Pandoc defaults file for `profile`.
+
+    Merges base and profile, optionally strips font variables and csl
+    settings and applies typography overrides (pass `overrides` only for
+    PDF/LaTeX builds). All of it happens in memory, so the file is written
+    once. `extra_yaml` is appended to the written file (not to the cached
+    entry). Returns (config path, uses gap paragraphs, uses titlesec paragraphs).
+
+    The result is cached in BUILD_CACHE_DIR keyed by the options and the
+    base/profile/script stamps, so repeated builds with the same flags skip
+    the merge and rewrite passes entirely. With `temp_config=None` the
+    defaults file itself is named after its content and kept in
+    BUILD_CACHE_DIR, so a repeated build writes nothing at all.
+    """
+    profile_path = f"{PROFILES_DIR}/{profile}.yaml"
+    cache_file = BUILD_CACHE_DIR / (
+        _defaults_cache_key(profile_path, {
+            "profile": profile,
+            "strip_fonts": strip_fonts,
+            "strip_csl": strip_csl,
+            "overrides": overrides,
+        }) + ".json"
+    )
+
+    try:
+        _build_cache_dir()
+        entry = json.loads(cache_file.read_text(encoding="utf-8"))
+        config_file = _write_defaults(entry["defaults"] + extra_yaml, temp_config)
+        return config_file, entry["uses_gap"], entry["uses_titlesec"]
+    except (OSError, ValueError, KeyError, TypeError):
+        pass
 
-        if style == "gap":
-            new_lines.insert(last_header_item_idx + 1, f"{indent_str}- \\usepackage{{parskip}}\n")
-            last_header_item_idx += 1
+    merged = build_merged_defaults(str(BASE_PROFILE), profile_path)
+    # Font variables and csl never affect the paragraph flags, so the
+    # metadata of the merged text holds for the rewritten one too
+    meta = _profile_meta_from_text(merged)
+    uses_gap = meta["gap_paragraphs"]
+    uses_titlesec = meta["uses_titlesec"]
+    defaults_text = _rewrite_defaults_text(
+        merged, meta, strip_fonts=strip_fonts, strip_csl=strip_csl, overrides=overrides,
+    )
 
-        new_lines.insert(last_header_item_idx + 1, f"{indent_str}- {injection}\n")
-        
-        path.write_text(''.join(new_lines))
+    try:
+        _build_cache_dir()
+        entry = {
+            "defaults": defaults_text,
+            "uses_gap": uses_gap,
+            "uses_titlesec": uses_titlesec,
+        }
+        _atomic_write(cache_file, json.dumps(entry).encode("utf-8"))
+    except OSError:
+        pass
+
+    return _write_defaults(defaults_text + extra_yaml, temp_config), uses_gap, uses_titlesec
+
+
+def _write_defaults(text: str, temp_config: Optional[str]) -> str:
+    """Write defaults `text` to `temp_config`, or to a content-named cache file when None.
+
+    Pandoc resolves relative paths in a defaults file against the working
+    directory, not the file's location, so the cached copy behaves the same.
+    """
+    if temp_config is not None:
+        _atomic_write(temp_config, text)
+        return temp_config
+    content = text.encode(locale.getpreferredencoding(False))
+    digest = hashlib.sha256(content).hexdigest()[:12]
+    config_file = _build_cache_dir() / f"defaults_{digest}.yaml"
+    try:
+        unchanged = config_file.read_bytes() == content
+    except OSError:
+        unchanged = False
+    if unchanged:
+        # Refresh the mtime so _prune_build_cache keeps files still in use
+        os.utime(config_file)
+    else:
+        _atomic_write(config_file, content)
+    return str(config_file)
+
+
+# Metadata overrides appended to the defaults of SI markdown builds; the
+# later metadata: key wins over the profile's, list values included
+_SI_MD_METADATA = (
+    '\n\n# --- SI Metadata Overrides ---\n'
+    'metadata:\n'
+    '  is_si: true\n'
+    '  figPrefix: ["Figure", "Figures"]\n'
+    '  tblPrefix: ["Table", "Tables"]\n'
+)
+
+
+# Guards read-modify-write of OUTPUT_CACHE from parallel builds
+_output_cache_lock = threading.Lock()
+
+# Top-level project files that may feed a build (bibliographies, metadata)
+_PROJECT_INPUT_SUFFIXES = (".json", ".bib", ".yaml", ".yml", ".csl")
+
+
+def _dependency_stamps(content: str) -> List[Tuple[str, Optional[Tuple[int, int]]]]:
+    """(path, stamp) of the local files a build may read besides its input.
+
+    Covers the filters, templates and reference docs next to this script,
+    the figures directory, bibliography-like files in the project root and
+    any relative link target in the document that exists on disk.
+    """
+    paths = set()
+    for directory, suffixes in ((str(SCRIPT_DIR), None), ("figures", None),
+                                (".", _PROJECT_INPUT_SUFFIXES)):
+        try:
+            with os.scandir(directory) as it:
+                for entry in it:
+                    name = entry.name
+                    if name.startswith(("_", ".")) or not entry.is_file():
+                        continue
+                    if suffixes is None or name.endswith(suffixes):
+                        paths.add(os.path.join(directory, name))
+        except OSError:
+            continue
+    for match in _LOCAL_REF_RE.finditer(content):
+        target = (match.group(1) or match.group(2)).split("#", 1)[0]
+        if target and "://" not in target and os.path.isfile(target):
+            paths.add(os.path.normpath(target))
+    return [(path, _file_stamp(Path(path))) for path in sorted(paths)]
+
+
+def _output_fingerprint(cmd: List[str], input_bytes: bytes, files: List[str],
+                        content: str) -> str:
+    """Hash everything that determines a Pandoc output.
+
+    The command line, the piped input, the Pandoc/pandoc-crossref versions
+    and `files` (the generated defaults, SI header, CSL) are hashed by
+    content; other dependencies by (mtime, size). Inputs it cannot see
+    (nested folders, \\input files, fonts, the PDF engine) are why the
+    skip is opt-in via --incremental.
+    """
+    h = hashlib.blake2b(digest_size=16)
+    h.update(json.dumps(cmd).encode("utf-8"))
+    h.update(_tool_versions())
+    h.update(input_bytes)
+    for path in files:
+        try:
+            with open(path, "rb") as f:
+                for chunk in iter(functools.partial(f.read, 1 << 20), b""):
+                    h.update(chunk)
+        except OSError:
+            h.update(b"\0")
+    h.update(json.dumps(_dependency_stamps(content)).encode("utf-8"))
+    return h.hexdigest()
+
+
+@functools.lru_cache(maxsize=1)
+def _tool_versions() -> bytes:
+    """`--version` output of pandoc and pandoc-crossref (empty if missing)."""
+    import subprocess
+    out = []
+    for tool in ("pandoc", "pandoc-crossref"):
+        try:
+            out.append(subprocess.run(
+                [tool, "--version"], stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL, timeout=30,
+            ).stdout)
+        except (OSError, subprocess.SubprocessError):
+            out.append(b"")
+    return b"\0".join(out)
+
+
+def _output_is_current(output_file: str, fingerprint: str) -> bool:
+    """True if `output_file` is unchanged since a build with `fingerprint`."""
+    try:
+        _build_cache_dir()
+    except OSError:
+        return False
+    entry = (_load_json_config(str(OUTPUT_CACHE)) or {}).get(os.path.abspath(output_file))
+    if not isinstance(entry, dict) or entry.get("fingerprint") != fingerprint:
+        return False
+    stamp = _file_stamp(Path(output_file))
+    return stamp is not None and list(stamp) == entry.get("output")
+
+
+def _record_output(output_file: str, fingerprint: str) -> None:
+    """Remember the fingerprint and stamp of a freshly built output."""
+    stamp = _file_stamp(Path(output_file))
+    if stamp is None:
+        return
+    with _output_cache_lock:
+        try:
+            _build_cache_dir()
+        except OSError:
+            return
+        cache = _load_json_config(str(OUTPUT_CACHE))
+        if not isinstance(cache, dict):
+            cache = {}
+        cache[os.path.abspath(output_file)] = {"fingerprint": fingerprint, "output": list(stamp)}
+        try:
+            _atomic_write(OUTPUT_CACHE, json.dumps(cache, indent=2))
+        except OSError:
+            pass
+
+
+# Directories already created (or found) by this process
+_dirs_ready: set = set()
+
+
+def _ensure_dir(path: Union[str, Path]) -> None:
+    """Create a directory (and parents) once per process."""
+    key = str(Path(path))
+    if key in _dirs_ready:
+        return
+    Path(key).mkdir(parents=True, exist_ok=True)
+    _dirs_ready.add(key)
+
+
+def _build_cache_dir() -> Path:
+    """Create BUILD_CACHE_DIR private to the current user and return it.
+
+    Raises OSError when the directory is not a real directory owned by the
+    current user, so nothing in it is read or trusted.
+    """
+    key = str(BUILD_CACHE_DIR)
+    if key in _dirs_ready:
+        return BUILD_CACHE_DIR
+    BUILD_CACHE_DIR.mkdir(mode=0o700, parents=True, exist_ok=True)
+    if hasattr(os, "getuid"):
+        st = os.lstat(BUILD_CACHE_DIR)
+        if not stat.S_ISDIR(st.st_mode) or st.st_uid != os.getuid():
+            raise OSError(f"Build cache {BUILD_CACHE_DIR} is not owned by the current user")
+        if st.st_mode & 0o077:
+            os.chmod(BUILD_CACHE_DIR, 0o700)
+    _dirs_ready.add(key)
+    _prune_build_cache()
+    return BUILD_CACHE_DIR
+
+
+def _prune_build_cache() -> None:
+    """Remove stale build cache entries (run once per process).
+
+    Entries older than BUILD_CACHE_MAX_AGE go, and of the rest only the
+    newest BUILD_CACHE_MAX_ENTRIES are kept.
+    """
+    try:
+        with os.scandir(BUILD_CACHE_DIR) as it:
+            entries = [(e.stat().st_mtime, e.path) for e in it if e.is_file(follow_symlinks=False)]
+    except OSError:
+        return
+    entries.sort(reverse=True)
+    cutoff = time.time() - BUILD_CACHE_MAX_AGE
+    for index, (mtime, path) in enumerate(entries):
+        if index >= BUILD_CACHE_MAX_ENTRIES or mtime < cutoff:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+
+def _forget_dirs(path: Union[str, Path]) -> None:
+    """Drop `path` and everything below it from the created-directory set."""
+    key = str(Path(path))
+    prefix = key + os.sep
+    for ready in [d for d in _dirs_ready if d == key or d.startswith(prefix)]:
+        _dirs_ready.discard(ready)
 
 
 def create_export_dir():
     """Create export directory if it doesn't exist."""
-    Path(EXPORT_DIR).mkdir(exist_ok=True)
+    _ensure_dir(EXPORT_DIR)
 
 
 def ensure_citation_styles_dir():
     """Create citation styles directory if it doesn't exist."""
-    Path(CITATION_STYLES_DIR).mkdir(exist_ok=True)
-
-
+    _ensure_dir(CITATION_STYLES_DIR)
 
 
 def resolve_citation_style(citation_style: str) -> Tuple[Optional[str], Optional[str]]:
@@ -967,32 +1498,51 @@ def resolve_citation_style(citation_style: str) -> Tuple[Optional[str], Optional
 
     style = citation_style.strip()
     ensure_citation_styles_dir()
+    try:
+        path = _locate_citation_style(style, _file_stamp(CITATION_STYLES_DIR))
+    except LookupError:
+        print(f"   Warning: Citation style '{style}' not found")
+        return None, None
+    # The title has its own (mtime, size)-keyed cache
+    return path, _extract_csl_title(Path(path))
+
+
+@functools.lru_cache(maxsize=64)
+def _locate_citation_style(style: str, stamp: Optional[Tuple[int, int]]) -> str:
+    """Find or download the CSL file for a style identifier.
 
+    Cached per styles-directory stamp: adding, removing or replacing a style
+    (downloads land via os.replace) changes it, so a removed file is never
+    returned and repeated lookups cost one stat. Raises LookupError when the
+    style cannot be found, so failures are not cached and a later build
+    retries the download.
+    """
     # Check local styles first (by stem or filename)
     candidate_files = [style]
     if not style.lower().endswith('.csl'):
         candidate_files.append(style + '.csl')
     for cand in candidate_files:
-        p = Path(CITATION_STYLES_DIR) / cand
+        p = CITATION_STYLES_DIR / cand
         if p.exists():
-            return str(p), _extract_csl_title(p)
+            return str(p)
 
     # Not found locally - try to download from Zotero
     path = download_csl_from_identifier(style)
     if path:
-        return path, _extract_csl_title(Path(path))
-    
-    print(f"   Warning: Citation style '{style}' not found")
-    return None, None
+        return path
+    raise LookupError(style)
 
 
-def create_si_header(pagenumbers: Optional[bool] = None):
-    """Create the SI header file for LaTeX.
+def create_si_header(pagenumbers: Optional[bool] = None) -> str:
+    """Create the SI header file for LaTeX and return its path.
     
     Args:
         pagenumbers: If False, skip the \\thepage redefinition to allow
                      \\pagenumbering{gobble} to work. If True or None,
                      include S-prefixed page numbering.
+    
+    The file is named after its content and kept in BUILD_CACHE_DIR, so
+    each variant is written once and shared by every later SI build.
     """
     lines = [
         r"\usepackage{lineno}",
@@ -1004,28 +1554,118 @@ def create_si_header(pagenumbers: Optional[bool] = None):
     if pagenumbers in (None, True):
         lines.append(r"\renewcommand{\thepage}{S\arabic{page}}")
     
-    content = "\n".join(lines) + "\n"
-    with open(SI_HEADER, "w") as f:
-        f.write(content)
+    content = ("\n".join(lines) + "\n").encode("utf-8")
+    digest = hashlib.sha256(content).hexdigest()[:12]
+    header = _build_cache_dir() / f"si_header_{digest}.tex"
+    try:
+        unchanged = header.read_bytes() == content
+    except OSError:
+        unchanged = False
+    if unchanged:
+        os.utime(header)
+    else:
+        _atomic_write(header, content)
+    return str(header)
+
+
+# Raster/vector figure formats that are copied to export as they are
+NON_PDF_FIGURE_EXTS = (".png", ".jpg", ".jpeg", ".webp", ".gif", ".svg")
+
+
+def _fast_copy(src: Path, dst: Path) -> None:
+    """Hardlink src to dst, falling back to a full copy.
+
+    A hardlink is a metadata-only operation, so multi-MB figures cost the
+    same as small ones. Cross-device targets and filesystems without
+    hardlink support fall back to shutil.copy2. An existing dst is
+    unlinked first so the source is never written through an old link.
+    """
+    try:
+        if dst.exists() or dst.is_symlink():
+            if os.path.samefile(src, dst):
+                return
+            dst.unlink()
+        os.link(src, dst)
+    except OSError:
+        shutil.copy2(src, dst)
+
+
+def _scan_figures(figures_dir: Path) -> Optional[Tuple[List[Path], List[Path], List[Path]]]:
+    """Classify figure files in one directory pass.
+
+    Returns (PDF files, non-PDF figure files, all files), or None if the
+    directory does not exist. DirEntry.is_file() reuses the readdir data,
+    so no extra stat is needed per entry.
+    """
+    pdf_files: List[Path] = []
+    image_files: List[Path] = []
+    all_files: List[Path] = []
+    try:
+        with os.scandir(figures_dir) as it:
+            for entry in it:
+                if not entry.is_file():
+                    continue
+                path = figures_dir / entry.name
+                all_files.append(path)
+                if entry.name.endswith(".pdf"):
+                    pdf_files.append(path)
+                elif os.path.splitext(entry.name)[1].lower() in NON_PDF_FIGURE_EXTS:
+                    image_files.append(path)
+    except OSError:
+        return None
+    return pdf_files, image_files, all_files
+
+
+def _mogrify(settings: List[str], pdf_files: List[Path]) -> Optional[str]:
+    """Run `magick mogrify` with `settings` over `pdf_files`, across CPU cores.
+
+    mogrify writes each result next to its PDF. Rasterizing is CPU-bound
+    and every PDF is independent, so the files are dealt into one batch per
+    core and the batches run as concurrent ImageMagick processes. Returns a
+    description of what failed, or None.
+    """
+    import subprocess
+    from concurrent.futures import ThreadPoolExecutor
+
+    paths = [str(pdf_file) for pdf_file in pdf_files]
+    workers = max(1, min(os.cpu_count() or 1, len(paths)))
 
+    def _run(batch: List[str]) -> int:
+        return subprocess.run(
+            ["magick", "mogrify", *settings, *batch],
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=False
+        ).returncode
 
-def convert_figures_to_png():
-    """Convert PDF figures to PNG using ImageMagick."""
-    figures_dir = Path("figures")
-    if figures_dir.exists():
-        pdf_files = list(figures_dir.glob("*.pdf"))
-        if pdf_files:
-            print("   Converting PDF figures to PNG...")
-            for pdf_file in pdf_files:
-                try:
-                    png_file = pdf_file.with_suffix('.png')
-                    subprocess.run(
-                        ["magick", "-density", "300", str(pdf_file), str(png_file)],
-                        capture_output=True,
-                        check=False
-                    )
-                except Exception:
-                    pass
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as ex:
+            codes = list(ex.map(_run, (paths[i::workers] for i in range(workers))))
+    except OSError as e:
+        return str(e)
+    failed = sum(1 for code in codes if code)
+    return f"ImageMagick failed on {failed} of {workers} batches" if failed else None
+
+
+def _start_png_conversion() -> Optional[Callable[[], None]]:
+    """Start converting PDF figures to PNG in the background.
+
+    Returns a callable that waits for the conversion and reports failures,
+    or None when there are no PDF figures.
+    """
+    scan = _scan_figures(Path("figures"))
+    if not scan or not scan[0]:
+        return None
+    print("   Converting PDF figures to PNG...")
+    from concurrent.futures import ThreadPoolExecutor
+    ex = ThreadPoolExecutor(max_workers=1)
+    # Writes figure.png next to figure.pdf
+    job = ex.submit(_mogrify, ["-density", "300", "-format", "png"], scan[0])
+    ex.shutdown(wait=False)
+
+    def finish() -> None:
+        error = job.result()
+        if error:
+            print(f"   Warning: Failed to convert figures: {error}")
+    return finish
 
 
 def convert_figures_for_web(
@@ -1047,118 +1687,207 @@ def convert_figures_for_web(
     figures_dir = Path("figures")
     export_figures_dir = Path("export/figures")
     
+    scan = _scan_figures(figures_dir)
+    
     if figure_format == "original":
         # Just copy original figures to export if requested
-        if copy_to_export and figures_dir.exists():
-            export_figures_dir.mkdir(parents=True, exist_ok=True)
-            for fig_file in figures_dir.iterdir():
-                if fig_file.is_file():
-                    shutil.copy2(fig_file, export_figures_dir / fig_file.name)
+        if copy_to_export and scan is not None:
+            _ensure_dir(export_figures_dir)
+            for fig_file in scan[2]:
+                _fast_copy(fig_file, export_figures_dir / fig_file.name)
             print("   Copied original figures to export/figures/")
         return
     
-    if not figures_dir.exists():
+    if scan is None:
         return
+    pdf_files, image_files, _ = scan
     
     # Create export figures directory if copying
     if copy_to_export:
-        export_figures_dir.mkdir(parents=True, exist_ok=True)
+        _ensure_dir(export_figures_dir)
     
     format_info = FIGURE_FORMAT_PRESETS.get(figure_format, FIGURE_FORMAT_PRESETS["png"])
     bg_info = FIGURE_BACKGROUND_PRESETS.get(figure_background, FIGURE_BACKGROUND_PRESETS["white"])
     
     # Convert PDF figures to web-friendly format
-    pdf_files = list(figures_dir.glob("*.pdf"))
+    converted: Dict[str, Path] = {}
     if pdf_files:
         print(f"   Converting PDF figures to {format_info['name']} ({bg_info['name']} background)...")
         
+        # All figures share the same settings; mogrify writes each result
+        # next to its PDF with the new extension.
+        settings = ["-density", str(density)]
+        
+        # Handle background
+        if figure_background == "transparent":
+            settings.extend(["-background", "none", "-alpha", "set"])
+        else:
+            settings.extend(["-background", bg_info["color"], "-alpha", "remove", "-alpha", "off"])
+        
+        # Add quality for lossy formats
+        if figure_format in ("webp", "jpg"):
+            settings.extend(["-quality", str(quality)])
+        
+        settings.extend(["-format", format_info["ext"]])
+        
+        error = _mogrify(settings, pdf_files)
+        if error:
+            print(f"   Warning: Failed to convert figures: {error}")
+        
         for pdf_file in pdf_files:
-            try:
-                output_file = pdf_file.with_suffix(f".{format_info['ext']}")
-                
-                # Build ImageMagick command with correct order:
-                # magick -density DPI input.pdf [processing options] output.png
-                cmd = ["magick", "-density", str(density), str(pdf_file)]
-                
-                # Handle background
-                if figure_background == "transparent":
-                    cmd.extend(["-background", "none", "-alpha", "set"])
-                else:
-                    cmd.extend(["-background", bg_info["color"], "-alpha", "remove", "-alpha", "off"])
-                
-                # Add quality for lossy formats
-                if figure_format in ("webp", "jpg"):
-                    cmd.extend(["-quality", str(quality)])
-                
-                cmd.append(str(output_file))
-                
-                subprocess.run(cmd, capture_output=True, check=False)
-                
-                # Copy to export directory if requested
-                if copy_to_export and output_file.exists():
-                    shutil.copy2(output_file, export_figures_dir / output_file.name)
-            except Exception as e:
-                print(f"   Warning: Failed to convert {pdf_file.name}: {e}")
+            output_file = pdf_file.with_suffix(f".{format_info['ext']}")
+            if not output_file.exists():
+                print(f"   Warning: Failed to convert {pdf_file.name}")
+                continue
+            converted[output_file.name] = output_file
+            # Copy to export directory if requested
+            if copy_to_export:
+                _fast_copy(output_file, export_figures_dir / output_file.name)
     
-    # Copy non-PDF figures (PNG, JPG, WebP, etc.) directly to export
+    # Copy non-PDF figures (PNG, JPG, WebP, etc.) directly to export; the
+    # freshly converted ones were copied above but still count as figures
     if copy_to_export:
-        non_pdf_exts = (".png", ".jpg", ".jpeg", ".webp", ".gif", ".svg")
-        non_pdf_files = [f for f in figures_dir.iterdir() 
-                         if f.is_file() and f.suffix.lower() in non_pdf_exts]
+        non_pdf_files = {f.name: f for f in image_files}
+        non_pdf_files.update(converted)
         if non_pdf_files:
-            for fig_file in non_pdf_files:
-                shutil.copy2(fig_file, export_figures_dir / fig_file.name)
+            for name, fig_file in non_pdf_files.items():
+                if name not in converted:
+                    _fast_copy(fig_file, export_figures_dir / name)
             print(f"   Copied {len(non_pdf_files)} non-PDF figures to export/figures/")
         
         print(f"   Copied converted figures to export/figures/")
 
 
+def prepare_markdown_figures(figure_format: Optional[str], figure_background: Optional[str],
+                             output_dir: Optional[str] = None) -> None:
+    """Convert figures for flattened markdown and copy them to export/figures.
+
+    If output_dir is specified (e.g. garden), the figures are copied there too.
+    """
+    custom_figures_dir = None
+    if output_dir:
+        custom_figures_dir = Path(output_dir) / "figures"
+        _ensure_dir(custom_figures_dir)
+
+    convert_figures_for_web(
+        figure_format=figure_format or "png",
+        figure_background=figure_background or "white",
+        copy_to_export=True
+    )
+    
+    # Also copy to custom output directory if needed
+    if custom_figures_dir:
+        figures_dir = Path("export/figures")
+        if figures_dir.exists():
+            for fig in figures_dir.glob("*"):
+                _fast_copy(fig, custom_figures_dir / fig.name)
+
+
 def list_markdown_files() -> List[str]:
     """List all markdown files in the current directory."""
-    md_files = sorted([f.name for f in Path(".").glob("*.md") 
-                      if not f.name.startswith("_") and f.name.lower() != "readme.md"])
-    return md_files
+    cwd = Path(".")
+    return [name for name in _scan_dir_names(cwd, _file_stamp(cwd), ".md")
+            if not name.startswith("_") and name.lower() != "readme.md"]
 
 
 def extract_si_citations(si_file: Optional[str] = None) -> str:
     """Extract literature citations from SI file, excluding cross-references."""
     si_path = Path(si_file) if si_file else Path(SUPPINFO)
-    if not si_path.exists():
+    stamp = _file_stamp(si_path)
+    if stamp is None:
         return ""
-    
-    with open(si_path, "r") as f:
-        content = f.read()
-    
-    citations = set(re.findall(r"@[a-zA-Z][a-zA-Z0-9_:-]*", content))
-    excluded = {"@Fig:", "@Tbl:", "@email"}
-    filtered = [c for c in citations if not any(c.startswith(e.rstrip(":")) for e in excluded)]
-    
-    return "; ".join(sorted(filtered))
+    return _si_citations(str(si_path.resolve()), stamp)
 
 
-def resolve_transclusions(content: str, base_dir: Path) -> str:
-    """Recursively resolve Obsidian transclusions ![[filename]]."""
-    
-    def _replace_transclusion(match):
-        filename = match.group(1).strip()
+@functools.lru_cache(maxsize=8)
+def _si_citations(path: str, stamp: Tuple[int, int]) -> str:
+    """Scan an SI file for citation keys once per (path, stamp).
+
+    The result is also kept in BUILD_CACHE_DIR, so later runs with an
+    unchanged SI file read it back instead of scanning again.
+    """
+    key = hashlib.sha256(json.dumps([path, stamp]).encode("utf-8")).hexdigest()
+    cache_file = BUILD_CACHE_DIR / f"citations-{key}.txt"
+    try:
+        _build_cache_dir()
+        return cache_file.read_text(encoding="utf-8")
+    except OSError:
+        pass
+
+    citations = set(_CITATION_RE.findall(Path(path).read_bytes()))
+    result = "; ".join(sorted(c.decode("ascii") for c in citations))
+    try:
+        _build_cache_dir()
+        _atomic_write(cache_file, result.encode("utf-8"))
+    except OSError:
+        pass
+    return result
+
+
+@functools.lru_cache(maxsize=4096)
+def _resolve_include(base_dir: str, filename: str, force_md: bool = False) -> Optional[str]:
+    """Resolve a transclusion target to an existing file path, or None.
+
+    Appends .md when the name has no suffix: only if the bare name does not
+    exist, or always with `force_md` (how the garden picks its pages).
+    Cached so repeated references cost no extra stat calls; top-level
+    builds clear it with _resolve_include.cache_clear().
+    """
+    file_path = Path(base_dir) / filename
+    if not file_path.suffix and (force_md or not file_path.exists()):
+        file_path = file_path.with_suffix(".md")
+    return str(file_path) if file_path.exists() else None
+
+
+def resolve_transclusions(content: str, base_dir: Path,
+                           _cache: Optional[Dict[str, Tuple[str, ...]]] = None) -> str:
+    """Recursively resolve Obsidian transclusions ![[filename]].
+
+    Each included file is read and expanded once per top-level call; later
+    references to the same file reuse the expanded text.
+    """
+    parts: List[str] = []
+    _expand_transclusions(content, base_dir, parts, {} if _cache is None else _cache)
+    return "".join(parts)
+
+
+def _expand_transclusions(content: str, base_dir: Path, out: List[str],
+                          cache: Dict[str, Tuple[str, ...]]) -> None:
+    """Append the expansion of `content` to `out` as a list of text chunks.
+
+    The caller joins the chunks once, instead of every recursion level
+    building (and copying) its own expanded string.
+    """
+    # With one capture group, split alternates literal text and link targets
+    for i, piece in enumerate(_TRANSCLUSION_RE.split(content)):
+        if i % 2 == 0:
+            if piece:
+                out.append(piece)
+            continue
+        
+        filename = piece.strip()
         
         # Handle cases like ![[filename|alias]] - take only filename
         if "|" in filename:
             filename = filename.split("|", 1)[0]
             
-        file_path = base_dir / filename
-        
         # Try appending .md if missing
-        if not file_path.exists() and not file_path.suffix:
-            file_path = file_path.with_suffix(".md")
+        file_path = _resolve_include(str(base_dir), filename)
             
-        if not file_path.exists():
+        if file_path is None:
             print(f"   Warning: Transcluded file not found: {filename}")
-            return match.group(0)  # Return original string if not found
-            
+            out.append(f"![[{piece}]]")  # Keep original string if not found
+            continue
+        
+        key = os.path.normpath(file_path)
+        cached = cache.get(key)
+        if cached is not None:
+            out.extend(cached)
+            continue
+        
+        start = len(out)
         try:
-            with open(file_path, "r", encoding="utf-8") as f:
-                transcluded_content = f.read()
+            transcluded_content = Path(file_path).read_text(encoding="utf-8")
                 
             # Strip YAML frontmatter from transcluded file
             if transcluded_content.startswith("---"):
@@ -1169,26 +1898,86 @@ def resolve_transclusions(content: str, base_dir: Path) -> str:
                     pass # Not valid frontmatter format
             
             # Recursively resolve transclusions in the included content
-            return resolve_transclusions(transcluded_content, base_dir)
+            _expand_transclusions(transcluded_content, base_dir, out, cache)
+            cache[key] = tuple(out[start:])
             
         except Exception as e:
+            del out[start:]
             print(f"   Warning: Error reading transcluded file {filename}: {e}")
-            return match.group(0)
+            out.append(f"![[{piece}]]")
+
+
+def _unescape_pandoc_match(match: re.Match) -> str:
+    return match.group(1) or match.group(0)
+
+
+# Per-thread buffer for print() output while garden pages build in parallel
+_thread_output = threading.local()
+
+
+class _ThreadBufferedStdout:
+    """sys.stdout stand-in sending writes of threads with a buffer to that buffer."""
+
+    def __init__(self, stream):
+        self._stream = stream
 
-    # Regex for ![[filename]]
-    pattern = r"!\[\[(.*?)\]\]"
-    return re.sub(pattern, _replace_transclusion, content)
+    def write(self, text: str) -> int:
+        buffer = getattr(_thread_output, "buffer", None)
+        return (self._stream if buffer is None else buffer).write(text)
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._stream, name)
+
+
+def _map_with_buffered_output(func: Callable[[Any], None], items: Any,
+                              max_workers: int) -> None:
+    """Call `func` on each item on a thread pool, printing each call's output as one block.
+
+    Blocks are printed in item order as the calls finish, so messages from
+    concurrent calls never interleave. Every call runs to completion; the
+    first exception (SystemExit from a failed pandoc run included) is
+    re-raised once all blocks are printed.
+    """
+    def _call(item: Any) -> Tuple[str, Optional[BaseException]]:
+        _thread_output.buffer = io.StringIO()
+        error = None
+        try:
+            func(item)
+        except BaseException as e:
+            error = e
+        finally:
+            text = _thread_output.buffer.getvalue()
+            _thread_output.buffer = None
+        return text, error
+
+    from concurrent.futures import ThreadPoolExecutor
+    stdout = sys.stdout
+    sys.stdout = _ThreadBufferedStdout(stdout)
+    first_error = None
+    try:
+        with ThreadPoolExecutor(max_workers=max_workers) as ex:
+            for text, error in ex.map(_call, items):
+                stdout.write(text)
+                stdout.flush()
+                if first_error is None:
+                    first_error = error
+    finally:
+        sys.stdout = stdout
+    if first_error is not None:
+        raise first_error
 
 
 def build_digital_garden(source_file: str, config: Dict[str, Any]):
     """Build a Digital Garden (collection of interlinked files)."""
+    _resolve_include.cache_clear()
     print_header()
     print(box_top("Digital Garden Build"))
     
     garden_dir = Path("export/garden")
     if garden_dir.exists():
         shutil.rmtree(garden_dir)
-    garden_dir.mkdir(parents=True, exist_ok=True)
+        _forget_dirs(garden_dir)
+    _ensure_dir(garden_dir)
     
     print(box_row(f"Source: {source_file}"))
     print(box_row(f"Output: {garden_dir}"))
@@ -1200,24 +1989,20 @@ def build_digital_garden(source_file: str, config: Dict[str, Any]):
         print(f"Error: Source file {source_file} not found.")
         return
 
-    with open(source_file, "r") as f:
-        master_content = f.read()
+    master_content = Path(source_file).read_text()
     
     # Find all ![[filename]] transclusions in Master file
     # We assume these are the files we want to include in the garden
-    transclusions = re.findall(r"!\[\[(.*?)\]\]", master_content)
+    transclusions = _TRANSCLUSION_RE.findall(master_content)
     
     files_to_build = []
     base_dir = Path(source_file).parent
     
     for link in transclusions:
         filename = link.split("|")[0].strip()
-        file_path = base_dir / filename
-        if not file_path.suffix:
-            file_path = file_path.with_suffix(".md")
-            
-        if file_path.exists():
-            files_to_build.append(file_path)
+        file_path = _resolve_include(str(base_dir), filename, force_md=True)
+        if file_path is not None:
+            files_to_build.append(Path(file_path))
     
     if not files_to_build:
         print("No files found in Master file transclusions.")
@@ -1238,12 +2023,9 @@ def build_digital_garden(source_file: str, config: Dict[str, Any]):
     
     for file_path in files_to_build:
         try:
-            with open(file_path, "r", encoding="utf-8") as f:
-                content = f.read()
-            
-            # Count figures and tables
-            num_figures = len(re.findall(r"\[!figure\]", content))
-            num_tables = len(re.findall(r"\[!table\]", content))
+            # The markers and labels are ASCII, so the pre-scan works on the
+            # raw bytes and skips decoding the file
+            content = file_path.read_bytes()
             
             file_offsets.append({
                 "figure_offset": cumulative_figures,
@@ -1264,20 +2046,38 @@ def build_digital_garden(source_file: str, config: Dict[str, Any]):
             current_tbl = cumulative_tables
             file_stem = f"garden_{file_path.stem}"
             
-            for line in content.splitlines():
-                if "[!figure]" in line:
-                    match = re.search(r"#(fig:[a-zA-Z0-9_\-]+)", line)
+            # One pass over the callout markers: count every figure/table and
+            # look at each line holding a callout once (a line with a figure
+            # callout is a figure line, as in the Lua filter).
+            num_figures = 0
+            num_tables = 0
+            last_line_start = -1
+            for callout in _CALLOUT_RE.finditer(content):
+                if callout.group(1) == b"figure":
+                    num_figures += 1
+                else:
+                    num_tables += 1
+                
+                line_start = content.rfind(b"\n", 0, callout.start()) + 1
+                if line_start == last_line_start:
+                    continue
+                last_line_start = line_start
+                line_end = content.find(b"\n", callout.end())
+                line = content[line_start:] if line_end == -1 else content[line_start:line_end]
+                
+                if b"[!figure]" in line:
+                    match = _FIG_LABEL_RE.search(line)
                     if match:
                         current_fig += 1
-                        global_label_map[match.group(1)] = {"num": current_fig, "file": file_stem}
+                        global_label_map[match.group(1).decode("ascii")] = {"num": current_fig, "file": file_stem}
                     else:
                         # Even if no label, it increments the counter
                         current_fig += 1
-                elif "[!table]" in line:
-                    match = re.search(r"#(tbl:[a-zA-Z0-9_\-]+)", line)
+                elif b"[!table]" in line:
+                    match = _TBL_LABEL_RE.search(line)
                     if match:
                         current_tbl += 1
-                        global_label_map[match.group(1)] = {"num": current_tbl, "file": file_stem}
+                        global_label_map[match.group(1).decode("ascii")] = {"num": current_tbl, "file": file_stem}
                     else:
                         current_tbl += 1
 
@@ -1287,7 +2087,15 @@ def build_digital_garden(source_file: str, config: Dict[str, Any]):
             print(f"   Warning: Could not pre-scan {file_path.name}: {e}")
             file_offsets.append({"figure_offset": 0, "table_offset": 0})
 
-    for i, file_path in enumerate(files_to_build):
+    # Figures are shared by all pages: convert and copy them once up front
+    prepare_markdown_figures(
+        config.get("figure_format", "png"),
+        config.get("figure_background", "white"),
+        str(garden_dir),
+    )
+
+    def _build_page(i: int) -> None:
+        file_path = files_to_build[i]
         print(f"[{i+1}/{len(files_to_build)}] Building {file_path.name}...")
         
         new_stem = f"garden_{file_path.stem}"
@@ -1297,10 +2105,9 @@ def build_digital_garden(source_file: str, config: Dict[str, Any]):
         next_file = files_to_build[i+1] if i < len(files_to_build) - 1 else None
         
         # Create a temp file with nav links injected
-        temp_file = f"_temp_garden_{file_path.name}"
+        temp_file = f"_temp_garden_{i}_{file_path.name}"
         
-        with open(file_path, "r") as f:
-            content = f.read()
+        content = file_path.read_text()
             
         # Add Nav Links
         nav_links = "\n\n---\n\n"
@@ -1316,61 +2123,61 @@ def build_digital_garden(source_file: str, config: Dict[str, Any]):
         if prev_file or next_file:
             content += nav_links
             
-        with open(temp_file, "w") as f:
-            f.write(content)
+        Path(temp_file).write_text(content)
             
         # Build it
         # We reuse build_document but target the garden directory
         # We pass the new prefixed filename as output_filename
-        build_document(
-            temp_file,
-            "md-flattened", # Force flat markdown profile
-            use_png=False,
-            include_si_refs=False,
-            frontmatter_file=None, # No frontmatter for individual garden pages usually
-            figure_format=config.get("figure_format", "png"),
-            figure_background=config.get("figure_background", "white"),
-            visualize_captions=config.get("visualize_captions", False),
-            caption_style=config.get("caption_style", "plain"),
-            margin_top=config.get("margin_top"),
-            margin_bottom=config.get("margin_bottom"),
-            margin_left=config.get("margin_left"),
-            margin_right=config.get("margin_right"),
-            output_dir=str(garden_dir),
-            output_filename=new_stem,
-            figure_offset=file_offsets[i]["figure_offset"],
-            table_offset=file_offsets[i]["table_offset"],
-            global_label_map=global_label_map
-        )
-        
-        # Cleanup temp
-        if Path(temp_file).exists():
-            os.remove(temp_file)
+        try:
+            build_document(
+                temp_file,
+                "md-flattened", # Force flat markdown profile
+                use_png=False,
+                include_si_refs=False,
+                frontmatter_file=None, # No frontmatter for individual garden pages usually
+                figure_format=config.get("figure_format", "png"),
+                figure_background=config.get("figure_background", "white"),
+                visualize_captions=config.get("visualize_captions", False),
+                caption_style=config.get("caption_style", "plain"),
+                margin_top=config.get("margin_top"),
+                margin_bottom=config.get("margin_bottom"),
+                margin_left=config.get("margin_left"),
+                margin_right=config.get("margin_right"),
+                output_dir=str(garden_dir),
+                output_filename=new_stem,
+                figure_offset=file_offsets[i]["figure_offset"],
+                table_offset=file_offsets[i]["table_offset"],
+                global_label_map=global_label_map,
+                figures_ready=True
+            )
+        finally:
+            # Cleanup temp, also when pandoc fails on this page
+            Path(temp_file).unlink(missing_ok=True)
             
         # Inject frontmatter to the output file
         out_filepath = garden_dir / f"{new_stem}.md"
         if out_filepath.exists():
-            with open(out_filepath, "r") as f:
-                built_content = f.read()
+            built_content = out_filepath.read_text()
             
             # Remove Pandoc's unnecessary escapes for wikilinks, underscores and stars
             # Pandoc escapes [[ as \[\[, _ as \_, and * as \*
             # We also handle escaped brackets to ensure clean links
-            built_content = built_content.replace("\\[\\[", "[[").replace("\\]\\]", "]]")
-            built_content = built_content.replace("\\[", "[").replace("\\]", "]")
-            built_content = built_content.replace("\\_", "_")
-            built_content = built_content.replace("\\*", "*")
+            built_content = _PANDOC_UNESCAPE_RE.sub(_unescape_pandoc_match, built_content)
             
             frontmatter = f"---\ntitle: \"{file_path.stem}\"\n---\n\n"
-            with open(out_filepath, "w") as f:
-                f.write(frontmatter + built_content)
+            _atomic_write(out_filepath, frontmatter + built_content)
+
+    # Pages are independent (own temp files and outputs) and spend their
+    # time in pandoc, so build them concurrently
+    workers = max(1, min(8, os.cpu_count() or 4, len(files_to_build)))
+    _map_with_buffered_output(_build_page, range(len(files_to_build)), workers)
 
     # 3. Create Master file (with links instead of transclusions)
     print("Building Master file...")
     index_content = master_content
     
     # Replace ![[filename]] with - [[new_filename|filename]]
-    index_content = re.sub(r"!\[\[(.*?)\]\]", r"- [[\1]]", index_content)
+    index_content = _TRANSCLUSION_RE.sub(r"- [[\1]]", index_content)
     
     def _fix_links(match):
         inner = match.group(1)
@@ -1387,17 +2194,36 @@ def build_digital_garden(source_file: str, config: Dict[str, Any]):
         else:
             return f"[[{new_stem}|{stem}]]"
 
-    index_content = re.sub(r"\[\[(.*?)\]\]", _fix_links, index_content)
+    index_content = _WIKILINK_RE.sub(_fix_links, index_content)
     
     # Write Master file
     master_output_filename = f"garden_{master_stem}.md"
-    with open(garden_dir / master_output_filename, "w") as f:
-        # No need to clean index_content as it hasn't passed through Pandoc
-        f.write(index_content)
+    # No need to clean index_content as it hasn't passed through Pandoc
+    _atomic_write(garden_dir / master_output_filename, index_content)
         
     print(f"✓ Digital Garden built in {garden_dir}")
 
 
+def _run_pandoc(cmd: List[str], input_bytes: bytes, capture: bool = False) -> bytes:
+    """Run `cmd` with `input_bytes` on stdin; exit with Pandoc's message on failure.
+
+    Pandoc normally writes to -o, so only stderr is kept (for errors).
+    With `capture`, stdout is returned too (used for "-o -").
+    """
+    import subprocess
+    try:
+        result = subprocess.run(
+            cmd, input=input_bytes, check=True,
+            stdout=subprocess.PIPE if capture else subprocess.DEVNULL,
+            stderr=subprocess.PIPE
+        )
+    except subprocess.CalledProcessError as e:
+        stderr = e.stderr.decode("utf-8", errors="replace") if e.stderr else ""
+        print(f"   Error: {stderr if stderr else 'Unknown error'}")
+        sys.exit(1)
+    return result.stdout or b""
+
+
 def build_document(source_file: str, profile: str, use_png: bool, include_si_refs: bool,
                    frontmatter_file: Optional[str] = None, font: Optional[str] = None,
                    fontsize: Optional[str] = None, citation_style: Optional[str] = None,
@@ -1413,8 +2239,12 @@ def build_document(source_file: str, profile: str, use_png: bool, include_si_ref
                    visualize_captions: bool = False, caption_style: str = "plain",
                    output_dir: Optional[str] = None, output_filename: Optional[str] = None,
                    figure_offset: int = 0, table_offset: int = 0,
-                   global_label_map: Optional[Dict[str, int]] = None):
-    """Build the document with specified profile."""
+                   global_label_map: Optional[Dict[str, int]] = None,
+                   figures_ready: bool = False, incremental: bool = False):
+    """Build the document with specified profile.
+
+    With `incremental`, Pandoc is skipped when the output looks up to date.
+    """
     # Get profile info
     _, _, fmt = get_profile_info(profile)
     
@@ -1438,11 +2268,10 @@ def build_document(source_file: str, profile: str, use_png: bool, include_si_ref
     
     if output_dir:
         target_dir = Path(output_dir)
-        target_dir.mkdir(parents=True, exist_ok=True)
+        _ensure_dir(target_dir)
         output_file = str(target_dir / f"{output_name}.{ext}")
     else:
         output_file = f"{EXPORT_DIR}/{output_name}.{ext}"
-    temp_merged = f"_temp_{output_name}_merged.md"
     
     if fmt == "latex" and tex_mode:
         print(f">> Building {source_file} (LATEX/{tex_mode.upper()})...")
@@ -1451,40 +2280,38 @@ def build_document(source_file: str, profile: str, use_png: bool, include_si_ref
     else:
         print(f">> Building {source_file} ({fmt.upper()})...")
     
+    # PNG conversion for DOCX runs while the input and defaults are being
+    # prepared; it finishes before the output is fingerprinted
+    finish_figures = None
+    if fmt == "docx" and use_png and not figures_ready:
+        finish_figures = _start_png_conversion()
+    
     # Resolve transclusions and merge frontmatter
-    # We always read source file and resolve transclusions now
+    # We always read source file and resolve transclusions now; the merged
+    # text is piped to pandoc on stdin, so no temp input file is written
     print(f"   Resolving transclusions in {source_file}...")
     try:
-        with open(source_file, "r", encoding="utf-8") as f:
-            source_content = f.read()
+        source_content = Path(source_file).read_text(encoding="utf-8")
             
         # Resolve transclusions relative to source file directory
         # If source_file is "src/Master.md", base_dir is "src"
         source_dir = Path(source_file).parent
         resolved_content = resolve_transclusions(source_content, source_dir)
         
-        # Write to temp merged file
-        with open(temp_merged, "w", encoding="utf-8") as out:
-            # Prepend frontmatter if requested
-            if frontmatter_file and Path(frontmatter_file).exists():
-                print(f"   Merging frontmatter from {frontmatter_file}...")
-                with open(frontmatter_file, "r", encoding="utf-8") as f:
-                    out.write(f.read())
-                out.write("\n")
-                
-                # If source had frontmatter, strip it to avoid duplication when merging
-                if resolved_content.startswith("---"):
-                    try:
-                        _, fm, body = resolved_content.split("---", 2)
-                        out.write(body)
-                    except ValueError:
-                        out.write(resolved_content)
-                else:
-                    out.write(resolved_content)
-            else:
-                out.write(resolved_content)
-                
-        input_file = temp_merged
+        # Pieces of the pandoc input, joined once all of them are known
+        # Prepend frontmatter if requested
+        if frontmatter_file and Path(frontmatter_file).exists():
+            print(f"   Merging frontmatter from {frontmatter_file}...")
+            body = resolved_content
+            # If source had frontmatter, strip it to avoid duplication when merging
+            if resolved_content.startswith("---"):
+                try:
+                    _, fm, body = resolved_content.split("---", 2)
+                except ValueError:
+                    body = resolved_content
+            parts = [Path(frontmatter_file).read_text(encoding="utf-8"), "\n", body]
+        else:
+            parts = [resolved_content]
         
     except Exception as e:
         print(f"   Error processing file: {e}")
@@ -1493,78 +2320,32 @@ def build_document(source_file: str, profile: str, use_png: bool, include_si_ref
     # Include SI refs for main document
     if include_si_refs and not is_si:
         print("   Including SI references in bibliography...")
-        if not frontmatter_file:
-            shutil.copy(source_file, temp_merged)
-            input_file = temp_merged
-        
         si_cites = extract_si_citations(si_file)
         if si_cites:
-            with open(temp_merged, "r") as f:
-                original_content = f.read()
-            nocite_header = f"---\nnocite: |\n  {si_cites}\n---\n\n"
-            with open(temp_merged, "w") as f:
-                f.write(nocite_header + original_content)
+            parts.insert(0, f"---\nnocite: |\n  {si_cites}\n---\n\n")
+    merged_content = "".join(parts)
 
-    # Convert figures for DOCX
-    if fmt == "docx" and use_png:
-        convert_figures_to_png()
-    
     # Convert figures for flattened markdown (always copy to export for md format)
-    if fmt == "md":
-        # If output_dir is specified (e.g. garden), copy figures there too
-        copy_to_custom = False
-        custom_figures_dir = None
-        if output_dir:
-            custom_figures_dir = Path(output_dir) / "figures"
-            custom_figures_dir.mkdir(parents=True, exist_ok=True)
-            copy_to_custom = True
-
-        convert_figures_for_web(
-            figure_format=figure_format or "png",
-            figure_background=figure_background or "white",
-            copy_to_export=True
-        )
-        
-        # Also copy to custom output directory if needed
-        if copy_to_custom and custom_figures_dir:
-            figures_dir = Path("export/figures")
-            if figures_dir.exists():
-                for fig in figures_dir.glob("*"):
-                    shutil.copy2(fig, custom_figures_dir / fig.name)
-    
-    # Merge configs
-    profile_path = f"{PROFILES_DIR}/{profile}.yaml"
-    config_file = merge_configs(BASE_PROFILE, profile_path)
-
+    # unless the caller (e.g. the garden) already did it for all pages
+    if fmt == "md" and not figures_ready:
+        prepare_markdown_figures(figure_format, figure_background, output_dir)
+    
+    # Merge configs, strip fonts and apply typography overrides (cached)
     is_latex_default_compat_font = font == "computer-modern"
-    if fmt == "latex" and tex_mode in ("portable", "body"):
-        strip_font_variables_from_defaults_file(config_file)
-    if fmt in ("pdf", "latex") and is_latex_default_compat_font:
-        strip_font_variables_from_defaults_file(config_file)
-
-    effective_gap = paragraph_style == "gap" or (
-        not paragraph_style and _profile_uses_gap_paragraphs(config_file)
+    strip_fonts = (fmt == "latex" and tex_mode in ("portable", "body")) or (
+        fmt in ("pdf", "latex") and is_latex_default_compat_font
     )
-    if effective_gap:
-        if input_file != temp_merged:
-            shutil.copy(source_file, temp_merged)
-            input_file = temp_merged
-        _normalize_inline_parindent_for_gap(input_file)
 
-    # Apply typography overrides directly to defaults file
     # Portable/body modes explicitly ignore explicit font selection for portability.
     effective_font = None if (
         (fmt == "latex" and tex_mode in ("portable", "body"))
         or is_latex_default_compat_font
     ) else font
     has_overrides = any([effective_font, fontsize, linespacing, paragraph_style, linenumbers is not None, pagenumbers is not None, numbered_headings is not None, language, papersize, margin_top, margin_bottom, margin_left, margin_right])
-    
-    # Always check for titlesec conflicts in PDF/LaTeX builds
-    has_titlesec_conflict = fmt in ("pdf", "latex") and _profile_uses_titlesec_paragraph(config_file)
-    
-    if fmt in ("pdf", "latex") and (has_overrides or has_titlesec_conflict):
-        apply_font_overrides_to_defaults_file(
-            config_file, font=effective_font, fontsize=fontsize,
+    overrides = None
+    if fmt in ("pdf", "latex"):
+        overrides = dict(
+            font=effective_font, fontsize=fontsize,
             linespacing=linespacing, paragraph_style=paragraph_style,
             linenumbers=linenumbers, pagenumbers=pagenumbers,
             numbered_headings=numbered_headings,
@@ -1573,75 +2354,99 @@ def build_document(source_file: str, profile: str, use_png: bool, include_si_ref
             margin_top=margin_top, margin_bottom=margin_bottom,
             margin_left=margin_left, margin_right=margin_right
         )
+    # SI markdown metadata goes into the defaults file as it is written:
+    # defaults metadata outranks the document's, and -M cannot carry lists
+    extra_yaml = _SI_MD_METADATA if is_si and fmt == "md" else ""
+    # A user-selected CSL goes in via metadata, so the profile's csl entry is
+    # stripped while the defaults file is written
+    csl_path, csl_name = resolve_citation_style(citation_style)
+    # The defaults file is content-addressed in BUILD_CACHE_DIR: nothing to
+    # write for a repeated build and nothing to clean up afterwards
+    config_file, uses_gap, uses_titlesec = prepare_defaults_file(
+        profile, strip_fonts=strip_fonts, overrides=overrides,
+        temp_config=None, extra_yaml=extra_yaml, strip_csl=bool(csl_path),
+    )
+
+    effective_gap = paragraph_style == "gap" or (
+        not paragraph_style and uses_gap
+    )
+    if effective_gap:
+        merged_content = _normalize_inline_parindent_text(merged_content)
+
+    # Always check for titlesec conflicts in PDF/LaTeX builds
+    has_titlesec_conflict = fmt in ("pdf", "latex") and uses_titlesec
+    
+    if fmt in ("pdf", "latex") and (has_overrides or has_titlesec_conflict):
+        # Collect the summary of active settings and print it in one call
+        summary: List[str] = []
         if effective_font and effective_font in FONT_PRESETS:
-            print(f"   Using font: {FONT_PRESETS[effective_font]['name']}")
+            summary.append(f"   Using font: {FONT_PRESETS[effective_font]['name']}")
         elif fmt == "pdf" and is_latex_default_compat_font:
-            print(f"   Using font: {FONT_PRESETS[font]['name']}")
+            summary.append(f"   Using font: {FONT_PRESETS[font]['name']}")
         if fontsize:
-            print(f"   Using font size: {fontsize}")
-        if linespacing and linespacing in LINE_SPACING_PRESETS:
-            print(f"   Using line spacing: {LINE_SPACING_PRESETS[linespacing]['name']}")
-        if paragraph_style and paragraph_style in PARAGRAPH_STYLE_PRESETS:
-            print(f"   Using paragraph style: {PARAGRAPH_STYLE_PRESETS[paragraph_style]['name']}")
-        if linenumbers is True:
-            print(f"   Line numbers: enabled")
-        elif linenumbers is False:
-            print(f"   Line numbers: disabled")
-        if pagenumbers is True:
-            print(f"   Page numbers: enabled")
-        elif pagenumbers is False:
-            print(f"   Page numbers: disabled")
-        if numbered_headings is True:
-            print(f"   Numbered headings: enabled")
-        elif numbered_headings is False:
-            print(f"   Numbered headings: disabled")
-        if language and language in LANGUAGE_PRESETS:
-            print(f"   Using language: {LANGUAGE_PRESETS[language]}")
-        if papersize and papersize in PAPER_SIZE_PRESETS:
-            print(f"   Using paper size: {PAPER_SIZE_PRESETS[papersize]}")
-        if any([margin_top, margin_bottom, margin_left, margin_right]):
-            customs = []
-            if margin_top: customs.append(f"T:{margin_top}")
-            if margin_bottom: customs.append(f"B:{margin_bottom}")
-            if margin_left: customs.append(f"L:{margin_left}")
-            if margin_right: customs.append(f"R:{margin_right}")
-            print(f"   Using margins: {' '.join(customs)}")
-    
-    # Build pandoc command
-    cmd = ["pandoc", input_file, "-o", output_file, f"--defaults={config_file}"]
+            summary.append(f"   Using font size: {fontsize}")
+        for label, value, presets in (
+            ("line spacing", linespacing, LINE_SPACING_PRESETS),
+            ("paragraph style", paragraph_style, PARAGRAPH_STYLE_PRESETS),
+        ):
+            if value and value in presets:
+                summary.append(f"   Using {label}: {presets[value]['name']}")
+        for label, flag in (
+            ("Line numbers", linenumbers),
+            ("Page numbers", pagenumbers),
+            ("Numbered headings", numbered_headings),
+        ):
+            if flag is True:
+                summary.append(f"   {label}: enabled")
+            elif flag is False:
+                summary.append(f"   {label}: disabled")
+        for label, value, presets in (
+            ("language", language, LANGUAGE_PRESETS),
+            ("paper size", papersize, PAPER_SIZE_PRESETS),
+        ):
+            if value and value in presets:
+                summary.append(f"   Using {label}: {presets[value]}")
+        customs = [
+            f"{side}:{value}"
+            for side, value in (("T", margin_top), ("B", margin_bottom),
+                                ("L", margin_left), ("R", margin_right))
+            if value
+        ]
+        if customs:
+            summary.append(f"   Using margins: {' '.join(customs)}")
+        if summary:
+            print("\n".join(summary))
+    
+    # Build pandoc command. Body-only LaTeX is read from pandoc's stdout and
+    # cut down in memory, so the full document never touches the disk
+    body_only = fmt == "latex" and tex_mode == "body"
+    if body_only:
+        cmd = ["pandoc", "-", "-t", "latex", "-o", "-", f"--defaults={config_file}"]
+    else:
+        cmd = ["pandoc", "-", "-o", output_file, f"--defaults={config_file}"]
     
     # Add standalone flag for LaTeX output (PDF output is always standalone)
     if fmt == "latex":
         cmd.append("-s")
 
     
+    # --metadata values, keyed by field and passed to pandoc in one go
+    metadata: Dict[str, str] = {}
+    
     # Add citation style
-    if citation_style:
-        csl_path, csl_name = resolve_citation_style(citation_style)
-        if csl_path:
-            strip_csl_from_defaults_file(config_file)
-            cmd.extend(["--metadata", f"csl:{csl_path}"])
-            if csl_name:
-                print(f"   Using citation style: {csl_name}")
+    if csl_path:
+        metadata["csl"] = csl_path
+        if csl_name:
+            print(f"   Using citation style: {csl_name}")
     
     # Add SI-specific options
+    si_header = None
     if is_si:
         if fmt in ("pdf", "latex"):
-            create_si_header(pagenumbers=pagenumbers)
-            cmd.extend([
-                "--metadata", 'figPrefix=["Fig.","Figs."]',
-                "--metadata", 'tblPrefix=["Table","Tables"]',
-                f"--include-in-header={SI_HEADER}"
-            ])
-        elif fmt == "md":
-            # For markdown, append metadata to the config file to ensure it overrides
-            # profile defaults (CLI args might not correctly override list structures in defaults)
-            with open(config_file, "a") as f:
-                f.write('\n\n# --- SI Metadata Overrides ---\n')
-                f.write('metadata:\n')
-                f.write('  is_si: true\n')
-                f.write('  figPrefix: ["Figure", "Figures"]\n')
-                f.write('  tblPrefix: ["Table", "Tables"]\n')
+            si_header = create_si_header(pagenumbers=pagenumbers)
+            metadata["figPrefix"] = '["Fig.","Figs."]'
+            metadata["tblPrefix"] = '["Table","Tables"]'
+            cmd.append(f"--include-in-header={si_header}")
     
     # Add lua filter for DOCX
     if fmt == "docx":
@@ -1649,140 +2454,268 @@ def build_document(source_file: str, profile: str, use_png: bool, include_si_ref
     
     # Add figure format metadata for flattened markdown
     if fmt == "md" and figure_format:
-        cmd.extend(["--metadata", f"figure-format:{figure_format}"])
+        metadata["figure-format"] = figure_format
     
     # Add visualize captions metadata for flattened markdown
     if fmt == "md":
         if visualize_captions:
-            cmd.extend(["--metadata", "visualize-captions=true"])
+            metadata["visualize-captions"] = "true"
         if caption_style and caption_style != "plain":
-            cmd.extend(["--metadata", f"caption-style:{caption_style}"])
+            metadata["caption-style"] = caption_style
         
         # Add offsets
         if figure_offset > 0:
-            cmd.extend(["--metadata", f"figure-offset:{figure_offset}"])
+            metadata["figure-offset"] = str(figure_offset)
         if table_offset > 0:
-            cmd.extend(["--metadata", f"table-offset:{table_offset}"])
+            metadata["table-offset"] = str(table_offset)
             
-        # Add global label map if provided
+        # Add global label map if provided, as a metadata block in front of
+        # the piped input (JSON is valid YAML, so no temp metadata file)
         if global_label_map:
-            # Create a temporary metadata file for the map
-            labels_meta_file = f"_temp_labels_{output_name}.json"
             labels_data = {"global-labels": global_label_map}
-            with open(labels_meta_file, "w") as f:
-                json.dump(labels_data, f)
-            cmd.extend(["--metadata-file", labels_meta_file])
+            merged_content = f"---\n{json.dumps(labels_data)}\n---\n\n" + merged_content
     
-    # Run pandoc
-    try:
-        result = subprocess.run(cmd, check=True, capture_output=True, text=True)
-    except subprocess.CalledProcessError as e:
-        print(f"   Error: {e.stderr if e.stderr else 'Unknown error'}")
-        # Remove temporary files
-        for f in [temp_merged, config_file]:
-            if f and Path(f).exists():
-                os.remove(f)
-        if Path(SI_HEADER).exists():
-            os.remove(SI_HEADER)
-        sys.exit(1)
+    cmd.extend(arg for key, value in metadata.items() for arg in ("--metadata", f"{key}={value}"))
     
-    if fmt == "latex" and tex_mode == "body":
-        convert_tex_file_to_body_only(output_file)
-
-    # Cleanup
-    # Remove temporary files
-    cleanup_files = [temp_merged, config_file]
-    if 'labels_meta_file' in locals() and Path(labels_meta_file).exists():
-        cleanup_files.append(labels_meta_file)
-        
-    for f in cleanup_files:
-        if f and Path(f).exists():
-            os.remove(f)
-    if Path(SI_HEADER).exists():
-        os.remove(SI_HEADER)
+    if finish_figures:
+        finish_figures()
+    
+    input_bytes = merged_content.encode("utf-8")
+    fingerprint = None
+    if incremental:
+        # Skip pandoc when neither the output nor anything feeding it changed
+        fingerprint_files = [config_file]
+        if si_header:
+            fingerprint_files.append(si_header)
+        if csl_path:
+            fingerprint_files.append(csl_path)
+        fingerprint = _output_fingerprint(
+            cmd + [f"tex-mode:{tex_mode}"], input_bytes, fingerprint_files, merged_content
+        )
+        if _output_is_current(output_file, fingerprint):
+            print(f"   ✓ {output_file} is up to date")
+            return
+    
+    stdout = _run_pandoc(cmd, input_bytes, capture=body_only)
+    if body_only:
+        body = _latex_body(stdout)
+        _atomic_write(output_file, stdout if body is None else body)
+    if fingerprint is not None:
+        _record_output(output_file, fingerprint)
     
     print(f"   ✓ {output_file} created")
 
 
+def build_many(source_files: List[str], profile: str, use_png: bool = False,
+               include_si_refs: bool = False, **options: Any) -> None:
+    """Build several documents with the same profile and options.
+
+    Used when --source is given more than once. Figures are prepared once
+    up front and the first build fills the defaults cache; the remaining
+    Pandoc runs go in parallel, each document's messages printed as one
+    block. Each document keeps its own Pandoc call: PDF/DOCX output cannot
+    be split back apart, and one shared run would mix citations and
+    cross-reference numbering.
+    """
+    _resolve_include.cache_clear()
+    if not source_files:
+        return
+
+    # Figures are shared by all documents: convert them once up front
+    _, _, fmt = get_profile_info(profile)
+    if fmt == "md":
+        prepare_markdown_figures(
+            options.get("figure_format"), options.get("figure_background"),
+            options.get("output_dir"),
+        )
+    elif fmt == "docx" and use_png:
+        finish_figures = _start_png_conversion()
+        if finish_figures:
+            finish_figures()
+    options["figures_ready"] = True
+
+    def _build(source_file: str) -> None:
+        build_document(source_file, profile, use_png, include_si_refs, **options)
+
+    first, rest = source_files[0], source_files[1:]
+    _build(first)
+    if rest:
+        workers = max(1, min(8, os.cpu_count() or 4, len(rest)))
+        _map_with_buffered_output(_build, rest, workers)
+
+
 # UI Constants
 BOX_WIDTH = 64  # Inner width for all frame boxes
 
+# Frame pieces built once at import
+_HRULE = "─" * BOX_WIDTH
+_BOX_TOP = "┌" + _HRULE + "┐"
+_BOX_BOTTOM = "└" + _HRULE + "┘"
+_ROW_WIDTH = BOX_WIDTH - 4
+
 def box_top(title: str = "") -> str:
     """Return top border with optional title."""
     if title:
-        return f"┌─ {title} " + "─" * (BOX_WIDTH - len(title) - 3) + "┐"
-    return "┌" + "─" * BOX_WIDTH + "┐"
+        return f"┌─ {title} {_HRULE[:max(0, BOX_WIDTH - len(title) - 3)]}┐"
+    return _BOX_TOP
 
 def box_row(text: str) -> str:
     """Return a row with content, padded to box width."""
-    return f"│  {text:<{BOX_WIDTH - 4}}  │"
+    return f"│  {text:<{_ROW_WIDTH}}  │"
 
 def box_bottom() -> str:
     """Return bottom border."""
-    return "└" + "─" * BOX_WIDTH + "┘"
+    return _BOX_BOTTOM
+
+# "Current Defaults" box pre-rendered with one %s slot per value; each row
+# pads like box_row(f"{label}: {value}")
+_DEFAULTS_LABELS = (
+    "Font", "Font Size", "Citation Style", "Line Spacing", "Paragraph Style",
+    "Line Numbers", "Headings", "Page Numbers", "Language",
+)
+_DEFAULTS_FRAME = "\n".join(
+    [box_top("Current Defaults")]
+    + [f"│  {label}: %-{_ROW_WIDTH - len(label) - 2}s  │" for label in _DEFAULTS_LABELS]
+    + [_BOX_BOTTOM]
+)
+# Settings read by configure_defaults, in _DEFAULTS_LABELS order
+_DEFAULTS_KEYS = (
+    "font", "fontsize", "citation_style", "linespacing", "paragraph_style",
+    "linenumbers", "numbered_headings", "pagenumbers", "language",
+)
+
+# Fixed preset menus: row format, whether rows sit in a box, (key, name) entries
+_PRESET_MENUS = {
+    "font": ("{i:2}) {name}{marker}", True,
+             tuple((key, FONT_PRESETS[key]["name"]) for key in _FONT_KEYS)),
+    "fontsize": ("{i:2}) {name}{marker}", True, tuple((size, size) for size in FONT_SIZES)),
+    "linespacing": ("  {i}) {name}{marker}", True,
+                    tuple((key, info["name"]) for key, info in _SPACING_ITEMS)),
+    "language": ("  {i}) {name}{marker}", True, _LANG_ITEMS),
+    "figure_format": ("│    {i}) {name}{marker}", False,
+                      tuple((key, info["name"]) for key, info in _FIG_FMT_ITEMS)),
+    "figure_background": ("│    {i}) {name}{marker}", False,
+                          tuple((key, info["name"]) for key, info in _FIG_BG_ITEMS)),
+}
+
+
+@functools.lru_cache(maxsize=128)
+def _preset_menu(menu: str, current: Optional[str]) -> str:
+    """Rows of a _PRESET_MENUS menu with `current` marked, rendered once per pair."""
+    row, boxed, entries = _PRESET_MENUS[menu]
+    rows = (
+        row.format(i=i, name=name, marker=" (current)" if key == current else "")
+        for i, (key, name) in enumerate(entries, 1)
+    )
+    return "\n".join(box_row(r) for r in rows) if boxed else "\n".join(rows)
+
+# Application header, written in one call by print_header()
+_HEADER = "\n".join([
+    "",
+    "╔" + "═" * BOX_WIDTH + "╗",
+    "║" + "Manuscript Build System".center(BOX_WIDTH) + "║",
+    "║" + "Cross-Platform • Multi-Profile".center(BOX_WIDTH) + "║",
+    "╚" + "═" * BOX_WIDTH + "╝",
+    "",
+])
+
+# Fixed interactive menu screens, each written with one print
+_MAIN_MENU = "\n".join([
+    box_top("Main Menu"),
+    box_row("1) Build Document"),
+    box_row("2) Quick Build (Repeat Last Build)"),
+    box_row("3) Configure Style/Citation Defaults"),
+    _BOX_BOTTOM,
+])
+_NO_LAST_BUILD = "\n".join([
+    "",
+    box_top("Quick Build"),
+    box_row("No previous build found. Please build a document first."),
+    _BOX_BOTTOM,
+])
+_FORMAT_MENU = "\n".join([
+    box_top("Output Format"),
+    box_row("1) Word Document (DOCX)"),
+    box_row("2) PDF"),
+    box_row("3) Flattened Markdown (for digital gardens)"),
+    box_row("4) LaTeX Source (profile exact)"),
+    box_row("5) Portable LaTeX"),
+    box_row("6) LaTeX Body-only (for journal templates)"),
+    _BOX_BOTTOM,
+])
 
 def print_header():
     """Print application header."""
-    print()
-    print("╔" + "═" * BOX_WIDTH + "╗")
-    print("║" + "Manuscript Build System".center(BOX_WIDTH) + "║")
-    print("║" + "Cross-Platform • Multi-Profile".center(BOX_WIDTH) + "║")
-    print("╚" + "═" * BOX_WIDTH + "╝")
-    print()
+    print(_HEADER)
+
+def _parse_menu_choice(choice: str, hi: int, lo: int = 0) -> Optional[int]:
+    """Return the numeric menu choice if it lies in [lo, hi], else None.
+
+    Validates before converting, so empty or invalid input never raises.
+    """
+    if choice.isdecimal():
+        value = int(choice)
+        if lo <= value <= hi:
+            return value
+    return None
+
 
 def print_build_summary(config: Dict[str, Any]) -> None:
     """Print build configuration summary."""
+    tex_mode, output_tex, font, fontsize, style_key = map(
+        config.get, ("tex_mode", "output_tex", "font", "fontsize", "citation_style")
+    )
     _, _, fmt = get_profile_info(config["profile"])
-    if fmt == "pdf" and config.get("tex_mode") in ("source", "portable", "body"):
+    if fmt == "pdf" and tex_mode in ("source", "portable", "body"):
         fmt = "latex"
-    if fmt == "pdf" and config.get("output_tex") and not config.get("tex_mode"):
+    if fmt == "pdf" and output_tex and not tex_mode:
         fmt = "latex"
-    print(box_top("Build Configuration"))
-    print(box_row(f"Document:     {config.get('source_file', config.get('doc_type', 'unknown'))}"))
-    print(box_row(f"Profile:      {config['profile']}"))
-    print(box_row(f"Format:       {fmt.upper()}"))
+    # Collect the whole box and write it with one print
+    lines = [box_top("Build Configuration")]
+    source_files = config.get('source_files') or [config.get('source_file', config.get('doc_type', 'unknown'))]
+    lines.append(box_row(f"Document:     {', '.join(source_files)}"))
+    lines.append(box_row(f"Profile:      {config['profile']}"))
+    lines.append(box_row(f"Format:       {fmt.upper()}"))
     fm_display = config.get('frontmatter_file') or 'None'
-    print(box_row(f"Frontmatter:  {fm_display}"))
+    lines.append(box_row(f"Frontmatter:  {fm_display}"))
     if fmt == "docx":
-        print(box_row(f"PNG Convert:  {'Yes' if config['use_png'] else 'No'}"))
-    print(box_row(f"SI Refs:      {'Yes' if config['include_si_refs'] else 'No'}"))
+        lines.append(box_row(f"PNG Convert:  {'Yes' if config['use_png'] else 'No'}"))
+    lines.append(box_row(f"SI Refs:      {'Yes' if config['include_si_refs'] else 'No'}"))
     if config.get('is_si'):
-        print(box_row("SI Format:    Yes (S-prefixed figures/tables)"))
+        lines.append(box_row("SI Format:    Yes (S-prefixed figures/tables)"))
     if fmt == "md":
         if config.get('visualize_captions'):
-            print(box_row("Captions:     Visible (Visualized)"))
+            lines.append(box_row("Captions:     Visible (Visualized)"))
         if config.get('caption_style') == "html":
-            print(box_row("Caption Style: HTML"))
-    if config.get('tex_mode') in ("source", "portable", "body"):
-        print(box_row(f"LaTeX Mode:   {config.get('tex_mode')}"))
-    elif config.get('output_tex'):
-        print(box_row("LaTeX Mode:   portable"))
-    if fmt in ("pdf", "latex") and config.get('font'):
-        font_name = FONT_PRESETS[config['font']]['name']
-        print(box_row(f"Font:         {font_name}"))
-    if fmt in ("pdf", "latex") and config.get('fontsize'):
-        print(box_row(f"Font Size:    {config['fontsize']}"))
-    if fmt in ("pdf", "latex", "docx") and config.get('citation_style'):
-        style_key = config['citation_style']
+            lines.append(box_row("Caption Style: HTML"))
+    if tex_mode in ("source", "portable", "body"):
+        lines.append(box_row(f"LaTeX Mode:   {tex_mode}"))
+    elif output_tex:
+        lines.append(box_row("LaTeX Mode:   portable"))
+    if fmt in ("pdf", "latex") and font:
+        font_name = FONT_PRESETS[font]['name']
+        lines.append(box_row(f"Font:         {font_name}"))
+    if fmt in ("pdf", "latex") and fontsize:
+        lines.append(box_row(f"Font Size:    {fontsize}"))
+    if fmt in ("pdf", "latex", "docx") and style_key:
         # Get display name from local file or use key
         local_styles = list_local_csl_files()
         style_name = next((n for k, n, _ in local_styles if k == style_key), style_key)
-        print(box_row(f"Citation:     {style_name}"))
-    print(box_bottom())
+        lines.append(box_row(f"Citation:     {style_name}"))
+    lines.append(box_bottom())
+    print("\n".join(lines))
 
 
 def print_profiles_list():
     """Print available profiles organized by category."""
-    print("\nAvailable Profiles:")
-    print("─" * 50)
+    lines = ["\nAvailable Profiles:", "─" * 50]
     
-    for category, profiles in get_profile_categories().items():
-        print(f"\n{category}:")
-        for profile in profiles:
-            name, description, fmt = get_profile_info(profile)
-            print(f"  • {profile:<25} {description}")
+    for category, entries in _profiles_by_category():
+        lines.append(f"\n{category}:")
+        lines.extend(f"  • {profile:<25} {description}" for profile, _, description in entries)
     
-    print()
+    lines.append("")
+    print("\n".join(lines))
 
 
 def configure_defaults() -> None:
@@ -1791,145 +2724,128 @@ def configure_defaults() -> None:
     
     defaults = load_defaults()
     
-    # Show current defaults
-    print(box_top("Current Defaults"))
-    current_font_key = defaults.get('font', '')
-    if current_font_key:
-        current_font_name = FONT_PRESETS.get(current_font_key, FONT_PRESETS['libertinus'])['name']
+    # Current settings, read once (None when unset); each menu below is
+    # drawn before its own setting changes, so the markers use these
+    font, fontsize, cite, ls, ps, ln, nh, pn, lang = map(defaults.get, _DEFAULTS_KEYS)
+    
+    # Show current defaults; each screen segment is written with one print
+    if font:
+        current_font_name = FONT_PRESETS.get(font, FONT_PRESETS['libertinus'])['name']
     else:
         current_font_name = 'Profile Default'
-    print(box_row(f"Font: {current_font_name}"))
-    print(box_row(f"Font Size: {defaults.get('fontsize', '11pt')}"))
-    style_key = defaults.get('citation_style', 'vancouver')
+    style_key = 'vancouver' if cite is None else cite
     local_styles = list_local_csl_files()
     style_name = next((n for k, n, _ in local_styles if k == style_key), style_key)
-    print(box_row(f"Citation Style: {style_name}"))
     # Typography settings
-    ls = defaults.get('linespacing', '')
-    print(box_row(f"Line Spacing: {LINE_SPACING_PRESETS[ls]['name'] if ls else 'Profile Default'}"))
-    ps = defaults.get('paragraph_style', '')
-    print(box_row(f"Paragraph Style: {PARAGRAPH_STYLE_PRESETS[ps]['name'] if ps else 'Profile Default'}"))
-    ln = defaults.get('linenumbers')
     ln_str = "Profile Default" if ln is None else ("Enabled" if ln else "Disabled")
-    print(box_row(f"Line Numbers: {ln_str}"))
-    nh = defaults.get('numbered_headings')
     nh_str = "Profile Default" if nh is None else ("Numbered" if nh else "Unnumbered")
-    print(box_row(f"Headings: {nh_str}"))
-    pn = defaults.get('pagenumbers')
     pn_str = "Profile Default" if pn is None else ("Enabled" if pn else "Disabled")
-    print(box_row(f"Page Numbers: {pn_str}"))
-    lang = defaults.get('language', '')
-    print(box_row(f"Language: {LANGUAGE_PRESETS.get(lang, 'Profile Default')}"))
-    print(box_bottom())
-    print()
+    lines = [
+        _DEFAULTS_FRAME % (
+            current_font_name,
+            '11pt' if fontsize is None else fontsize,
+            style_name,
+            LINE_SPACING_PRESETS[ls]['name'] if ls else 'Profile Default',
+            PARAGRAPH_STYLE_PRESETS[ps]['name'] if ps else 'Profile Default',
+            ln_str,
+            nh_str,
+            pn_str,
+            LANGUAGE_PRESETS.get(lang, 'Profile Default'),
+        ),
+        "",
+    ]
     
     # Font selection
-    print(box_top("Font Selection"))
-    print(box_row(f" 0) Profile Default{' (current)' if not defaults.get('font') else ''}"))
-    font_list = list(FONT_PRESETS.keys())
-    for i, key in enumerate(font_list, 1):
-        name = FONT_PRESETS[key]["name"]
-        marker = " (current)" if key == defaults.get('font') else ""
-        print(box_row(f"{i:2}) {name}{marker}"))
-    print(box_bottom())
+    lines.append(box_top("Font Selection"))
+    lines.append(box_row(f" 0) Profile Default{' (current)' if not font else ''}"))
+    font_list = _FONT_KEYS
+    lines.append(_preset_menu("font", font))
+    lines.append(box_bottom())
+    print("\n".join(lines))
     
     font_choice = input(f"Select font [0-{len(font_list)}, Enter=keep current]: ").strip()
-    if font_choice:
-        try:
-            if int(font_choice) == 0:
-                defaults['font'] = ''
-            else:
-                idx = int(font_choice) - 1
-                if 0 <= idx < len(font_list):
-                    defaults['font'] = font_list[idx]
-        except (ValueError, IndexError):
-            pass
-    
-    print()
+    choice = _parse_menu_choice(font_choice, len(font_list))
+    if choice == 0:
+        defaults['font'] = ''
+    elif choice:
+        defaults['font'] = font_list[choice - 1]
     
     # Font size selection
-    print(box_top("Font Size Selection"))
-    for i, size in enumerate(FONT_SIZES, 1):
-        marker = " (current)" if size == defaults.get('fontsize') else ""
-        print(box_row(f"{i:2}) {size}{marker}"))
-    print(box_bottom())
+    lines = ["", box_top("Font Size Selection")]
+    lines.append(_preset_menu("fontsize", fontsize))
+    lines.append(box_bottom())
+    print("\n".join(lines))
     
     size_choice = input(f"Select size [1-{len(FONT_SIZES)}, Enter=keep current]: ").strip()
-    if size_choice:
-        try:
-            idx = int(size_choice) - 1
-            if 0 <= idx < len(FONT_SIZES):
-                defaults['fontsize'] = FONT_SIZES[idx]
-        except (ValueError, IndexError):
-            pass
-    
-    print()
+    choice = _parse_menu_choice(size_choice, len(FONT_SIZES), 1)
+    if choice:
+        defaults['fontsize'] = FONT_SIZES[choice - 1]
     
     # Citation style selection
-    print(box_top("Citation Style Selection"))
+    lines = ["", box_top("Citation Style Selection")]
     local_styles = list_local_csl_files()
     
     if local_styles:
         for i, (key, name, _) in enumerate(local_styles, 1):
-            marker = " (current)" if key == defaults.get('citation_style') else ""
-            print(box_row(f"{i:2}) {name}{marker}"))
-        print(box_row(f"{len(local_styles)+1:2}) Download by Zotero style ID or URL"))
+            marker = " (current)" if key == cite else ""
+            lines.append(box_row(f"{i:2}) {name}{marker}"))
+        lines.append(box_row(f"{len(local_styles)+1:2}) Download by Zotero style ID or URL"))
     else:
-        print(box_row("   No citation styles installed yet"))
-        print(box_row(" 1) Download by Zotero style ID or URL"))
-    print(box_bottom())
+        lines.append(box_row("   No citation styles installed yet"))
+        lines.append(box_row(" 1) Download by Zotero style ID or URL"))
+    lines.append(box_bottom())
+    print("\n".join(lines))
     
     max_choice = len(local_styles) + 1 if local_styles else 1
     style_choice = input(f"Select style [1-{max_choice}, Enter=keep current]: ").strip()
-    if style_choice:
-        try:
-            idx = int(style_choice) - 1
-            if local_styles and 0 <= idx < len(local_styles):
-                defaults['citation_style'] = local_styles[idx][0]
-            elif idx == len(local_styles) if local_styles else idx == 0:
-                print("│   Find styles at: https://www.zotero.org/styles")
-                ident = input("│  Enter Zotero style ID or URL: ").strip()
-                if ident:
-                    csl_path = download_csl_from_identifier(ident)
-                    if csl_path:
-                        csl_key = Path(csl_path).stem
-                        defaults['citation_style'] = csl_key
-        except (ValueError, IndexError):
-            pass
-    
-    print()
+    choice = _parse_menu_choice(style_choice, max_choice, 1)
+    if choice:
+        if choice < max_choice:
+            defaults['citation_style'] = local_styles[choice - 1][0]
+        else:
+            print("│   Find styles at: https://www.zotero.org/styles")
+            idents = input("│  Enter Zotero style ID(s) or URL(s), comma-separated: ").replace(",", " ").split()
+            if idents:
+                # Several styles download in parallel; styles already on
+                # disk are revalidated. The first one that succeeds becomes
+                # the default
+                downloaded = download_csl_many(idents, refresh=True)
+                csl_path = next(filter(None, map(downloaded.get, idents)), None)
+                if csl_path:
+                    csl_key = Path(csl_path).stem
+                    defaults['citation_style'] = csl_key
     
     # Typography settings (PDF only)
-    print(box_top("Typography Settings (PDF only)"))
-    print(box_row("These override profile defaults for PDF output"))
-    print(box_row(""))
+    lines = [
+        "",
+        box_top("Typography Settings (PDF only)"),
+        box_row("These override profile defaults for PDF output"),
+        box_row(""),
+    ]
     
     # Line spacing
-    spacing_list = list(LINE_SPACING_PRESETS.items())
-    print(box_row("Line Spacing:"))
-    print(box_row("  0) Profile Default"))
-    for i, (key, info) in enumerate(spacing_list, 1):
-        marker = " (current)" if key == defaults.get('linespacing') else ""
-        print(box_row(f"  {i}) {info['name']}{marker}"))
+    spacing_list = _SPACING_ITEMS
+    lines.append(box_row("Line Spacing:"))
+    lines.append(box_row("  0) Profile Default"))
+    lines.append(_preset_menu("linespacing", ls))
+    print("\n".join(lines))
     spacing_choice = input("│  Select line spacing [0-5, Enter=keep current]: ").strip()
-    if spacing_choice:
-        try:
-            spacing_idx = int(spacing_choice)
-            if spacing_idx == 0:
-                defaults['linespacing'] = ""
-            elif spacing_idx > 0:
-                defaults['linespacing'] = spacing_list[spacing_idx - 1][0]
-        except (ValueError, IndexError):
-            pass
+    choice = _parse_menu_choice(spacing_choice, len(spacing_list))
+    if choice == 0:
+        defaults['linespacing'] = ""
+    elif choice:
+        defaults['linespacing'] = spacing_list[choice - 1][0]
     
     # Paragraph style
-    print(box_row(""))
-    print(box_row("Paragraph Style:"))
-    cur_ps = defaults.get('paragraph_style', '')
-    print(box_row(f"  0) Profile Default{' (current)' if not cur_ps else ''}"))
-    print(box_row(f"  1) Indented (American){' (current)' if cur_ps == 'indent' else ''}"))
-    print(box_row(f"  2) Gap (European){' (current)' if cur_ps == 'gap' else ''}"))
-    print(box_row(f"  3) Gap + Indent (Both){' (current)' if cur_ps == 'both' else ''}"))
+    lines = [
+        box_row(""),
+        box_row("Paragraph Style:"),
+        box_row(f"  0) Profile Default{' (current)' if not ps else ''}"),
+        box_row(f"  1) Indented (American){' (current)' if ps == 'indent' else ''}"),
+        box_row(f"  2) Gap (European){' (current)' if ps == 'gap' else ''}"),
+        box_row(f"  3) Gap + Indent (Both){' (current)' if ps == 'both' else ''}"),
+    ]
+    print("\n".join(lines))
     para_choice = input("│  Select paragraph style [0-3, Enter=keep current]: ").strip()
     if para_choice:
         if para_choice == "0":
@@ -1942,12 +2858,14 @@ def configure_defaults() -> None:
             defaults['paragraph_style'] = "both"
     
     # Line numbers
-    print(box_row(""))
-    cur_ln = defaults.get('linenumbers')
-    print(box_row("Line Numbers:"))
-    print(box_row(f"  0) Profile Default{' (current)' if cur_ln is None else ''}"))
-    print(box_row(f"  1) Enable{' (current)' if cur_ln is True else ''}"))
-    print(box_row(f"  2) Disable{' (current)' if cur_ln is False else ''}"))
+    lines = [
+        box_row(""),
+        box_row("Line Numbers:"),
+        box_row(f"  0) Profile Default{' (current)' if ln is None else ''}"),
+        box_row(f"  1) Enable{' (current)' if ln is True else ''}"),
+        box_row(f"  2) Disable{' (current)' if ln is False else ''}"),
+    ]
+    print("\n".join(lines))
     ln_choice = input("│  Select line numbers [0-2, Enter=keep current]: ").strip()
     if ln_choice:
         if ln_choice == "0":
@@ -1958,12 +2876,14 @@ def configure_defaults() -> None:
             defaults['linenumbers'] = False
     
     # Numbered headings
-    print(box_row(""))
-    cur_nh = defaults.get('numbered_headings')
-    print(box_row("Numbered Headings:"))
-    print(box_row(f"  0) Profile Default{' (current)' if cur_nh is None else ''}"))
-    print(box_row(f"  1) Numbered{' (current)' if cur_nh is True else ''}"))
-    print(box_row(f"  2) Unnumbered{' (current)' if cur_nh is False else ''}"))
+    lines = [
+        box_row(""),
+        box_row("Numbered Headings:"),
+        box_row(f"  0) Profile Default{' (current)' if nh is None else ''}"),
+        box_row(f"  1) Numbered{' (current)' if nh is True else ''}"),
+        box_row(f"  2) Unnumbered{' (current)' if nh is False else ''}"),
+    ]
+    print("\n".join(lines))
     nh_choice = input("│  Select heading numbering [0-2, Enter=keep current]: ").strip()
     if nh_choice:
         if nh_choice == "0":
@@ -1974,12 +2894,14 @@ def configure_defaults() -> None:
             defaults['numbered_headings'] = False
 
     # Page numbers
-    print(box_row(""))
-    cur_pn = defaults.get('pagenumbers')
-    print(box_row("Page Numbers:"))
-    print(box_row(f"  0) Profile Default{' (current)' if cur_pn is None else ''}"))
-    print(box_row(f"  1) Enable{' (current)' if cur_pn is True else ''}"))
-    print(box_row(f"  2) Disable{' (current)' if cur_pn is False else ''}"))
+    lines = [
+        box_row(""),
+        box_row("Page Numbers:"),
+        box_row(f"  0) Profile Default{' (current)' if pn is None else ''}"),
+        box_row(f"  1) Enable{' (current)' if pn is True else ''}"),
+        box_row(f"  2) Disable{' (current)' if pn is False else ''}"),
+    ]
+    print("\n".join(lines))
     pn_choice = input("│  Select page numbering [0-2, Enter=keep current]: ").strip()
     if pn_choice:
         if pn_choice == "0":
@@ -1990,24 +2912,20 @@ def configure_defaults() -> None:
             defaults['pagenumbers'] = False
     
     # Language
-    print(box_row(""))
-    lang_list = list(LANGUAGE_PRESETS.items())
-    cur_lang = defaults.get('language', '')
-    print(box_row("Document Language:"))
-    print(box_row(f"  0) Profile Default{' (current)' if not cur_lang else ''}"))
-    for i, (key, name) in enumerate(lang_list, 1):
-        marker = " (current)" if key == cur_lang else ""
-        print(box_row(f"  {i}) {name}{marker}"))
+    lang_list = _LANG_ITEMS
+    lines = [
+        box_row(""),
+        box_row("Document Language:"),
+        box_row(f"  0) Profile Default{' (current)' if not lang else ''}"),
+        _preset_menu("language", lang),
+    ]
+    print("\n".join(lines))
     lang_choice = input(f"│  Select language [0-{len(lang_list)}, Enter=keep current]: ").strip()
-    if lang_choice:
-        try:
-            lang_idx = int(lang_choice)
-            if lang_idx == 0:
-                defaults['language'] = ""
-            elif lang_idx > 0:
-                defaults['language'] = lang_list[lang_idx - 1][0]
-        except (ValueError, IndexError):
-            pass
+    choice = _parse_menu_choice(lang_choice, len(lang_list))
+    if choice == 0:
+        defaults['language'] = ""
+    elif choice:
+        defaults['language'] = lang_list[choice - 1][0]
     
     print(box_bottom())
     print()
@@ -2024,11 +2942,7 @@ def interactive_menu() -> Dict[str, Any]:
     last_config = load_last_config()
     
     # Main menu
-    print(box_top("Main Menu"))
-    print(box_row("1) Build Document"))
-    print(box_row("2) Quick Build (Repeat Last Build)"))
-    print(box_row("3) Configure Style/Citation Defaults"))
-    print(box_bottom())
+    print(_MAIN_MENU)
     
     main_choice = input("Select option [1-3]: ").strip()
     
@@ -2058,10 +2972,7 @@ def interactive_menu() -> Dict[str, Any]:
             
             return last_config
         else:
-            print()
-            print(box_top("Quick Build"))
-            print(box_row("No previous build found. Please build a document first."))
-            print(box_bottom())
+            print(_NO_LAST_BUILD)
             input("Press Enter to continue...")
             return interactive_menu()
     
@@ -2071,27 +2982,17 @@ def interactive_menu() -> Dict[str, Any]:
         print("No markdown files found in the current directory.")
         sys.exit(1)
     
-    print(box_top("Select Document"))
-    for i, f in enumerate(md_files, 1):
-        print(box_row(f"{i:2}) {f}"))
-    print(box_bottom())
+    # Numbered file rows, shared by the document and frontmatter menus
+    file_rows = [box_row(f"{i:2}) {f}") for i, f in enumerate(md_files, 1)]
+    print("\n".join([box_top("Select Document"), *file_rows, box_bottom()]))
     doc_choice = input(f"Select document [1-{len(md_files)}]: ").strip()
-    try:
-        doc_idx = int(doc_choice) - 1
-        source_file = md_files[doc_idx]
-    except (ValueError, IndexError):
-        source_file = md_files[0]  # default to first file
+    choice = _parse_menu_choice(doc_choice, len(md_files), 1)
+    # default to first file
+    source_file = md_files[choice - 1] if choice else md_files[0]
     print()
     
     # Format selection
-    print(box_top("Output Format"))
-    print(box_row("1) Word Document (DOCX)"))
-    print(box_row("2) PDF"))
-    print(box_row("3) Flattened Markdown (for digital gardens)"))
-    print(box_row("4) LaTeX Source (profile exact)"))
-    print(box_row("5) Portable LaTeX"))
-    print(box_row("6) LaTeX Body-only (for journal templates)"))
-    print(box_bottom())
+    print(_FORMAT_MENU)
     fmt_choice = input("Select format [1-6]: ").strip()
     if fmt_choice == "1":
         fmt = "docx"
@@ -2119,26 +3020,23 @@ def interactive_menu() -> Dict[str, Any]:
     elif fmt == "md":
         profile = "md-flattened"
     else:
-        print(box_top("Output Profile"))
+        # All LaTeX modes use the PDF profiles as their base configuration.
+        desired_profile_fmt = "pdf" if tex_mode in ("source", "portable", "body") else fmt
+        lines = [box_top("Output Profile")]
         all_profiles = []
-        idx = 1
-        for category, profiles in get_profile_categories().items():
-            print(box_row(f"{category}:"))
-            for profile in profiles:
-                name, description, profile_fmt = get_profile_info(profile)
-                # All LaTeX modes use the PDF profiles as their base configuration.
-                desired_profile_fmt = "pdf" if tex_mode in ("source", "portable", "body") else fmt
-                if profile_fmt == desired_profile_fmt:
-                    all_profiles.append(profile)
-                    print(box_row(f"  {idx:2}) {name}"))
-                    idx += 1
-        print(box_bottom())
+        for category, entries in _profiles_by_category(desired_profile_fmt):
+            lines.append(box_row(f"{category}:"))
+            for profile, name, _ in entries:
+                all_profiles.append(profile)
+                lines.append(box_row(f"  {len(all_profiles):2}) {name}"))
+        lines.append(box_bottom())
+        print("\n".join(lines))
         
         profile_choice = input(f"Select profile [1-{len(all_profiles)}]: ").strip()
-        try:
-            profile_idx = int(profile_choice) - 1
-            profile = all_profiles[profile_idx]
-        except (ValueError, IndexError):
+        choice = _parse_menu_choice(profile_choice, len(all_profiles), 1)
+        if choice:
+            profile = all_profiles[choice - 1]
+        else:
             print("Invalid choice, using default")
             profile = "pdf-default"
     
@@ -2152,19 +3050,12 @@ def interactive_menu() -> Dict[str, Any]:
     include_si_refs = False
     
     # Frontmatter selection - list all markdown files plus "None" option
-    print(box_top("Select Frontmatter"))
-    print(box_row(f" 0) None (no frontmatter)"))
-    for i, f in enumerate(md_files, 1):
-        print(box_row(f"{i:2}) {f}"))
-    print(box_bottom())
+    print("\n".join([
+        box_top("Select Frontmatter"), box_row(" 0) None (no frontmatter)"), *file_rows, box_bottom()
+    ]))
     fm_choice = input(f"Select frontmatter [0-{len(md_files)}]: ").strip()
-    frontmatter_file = None
-    try:
-        fm_idx = int(fm_choice)
-        if fm_idx > 0:
-            frontmatter_file = md_files[fm_idx - 1]
-    except (ValueError, IndexError):
-        frontmatter_file = None
+    choice = _parse_menu_choice(fm_choice, len(md_files))
+    frontmatter_file = md_files[choice - 1] if choice else None
     print()
     
     print(box_top("Options"))
@@ -2176,15 +3067,13 @@ def interactive_menu() -> Dict[str, Any]:
     # If including SI refs, ask which file contains SI
     si_file = None
     if include_si_refs:
-        print("│")
-        print("│  Select SI file for reference extraction:")
-        for i, f in enumerate(md_files, 1):
-            print(f"│    {i:2}) {f}")
+        print("\n".join(["│", "│  Select SI file for reference extraction:",
+                         *(f"│    {i:2}) {f}" for i, f in enumerate(md_files, 1))]))
         si_choice = input(f"│  Select SI file [1-{len(md_files)}]: ").strip()
-        try:
-            si_idx = int(si_choice) - 1
-            si_file = md_files[si_idx]
-        except (ValueError, IndexError):
+        choice = _parse_menu_choice(si_choice, len(md_files), 1)
+        if choice:
+            si_file = md_files[choice - 1]
+        else:
             si_file = SUPPINFO if Path(SUPPINFO).exists() else None
     
     if fmt == "docx":
@@ -2196,37 +3085,23 @@ def interactive_menu() -> Dict[str, Any]:
     figure_background = defaults.get('figure_background', 'white')
     
     if fmt == "md":
-        print("│")
-        print("│  Figure Format:")
-        format_list = list(FIGURE_FORMAT_PRESETS.items())
-        for i, (key, info) in enumerate(format_list, 1):
-            marker = " (current)" if key == figure_format else ""
-            print(f"│    {i}) {info['name']}{marker}")
+        print("│\n│  Figure Format:")
+        format_list = _FIG_FMT_ITEMS
+        print(_preset_menu("figure_format", figure_format))
         fig_fmt_choice = input(f"│  Select figure format [1-{len(format_list)}, Enter=keep current]: ").strip()
-        if fig_fmt_choice:
-            try:
-                fig_fmt_idx = int(fig_fmt_choice) - 1
-                if 0 <= fig_fmt_idx < len(format_list):
-                    figure_format = format_list[fig_fmt_idx][0]
-            except (ValueError, IndexError):
-                pass
+        choice = _parse_menu_choice(fig_fmt_choice, len(format_list), 1)
+        if choice:
+            figure_format = format_list[choice - 1][0]
         
         # Only ask for background if not keeping original format
         if figure_format != "original":
-            print("│")
-            print("│  Figure Background:")
-            bg_list = list(FIGURE_BACKGROUND_PRESETS.items())
-            for i, (key, info) in enumerate(bg_list, 1):
-                marker = " (current)" if key == figure_background else ""
-                print(f"│    {i}) {info['name']}{marker}")
+            print("│\n│  Figure Background:")
+            bg_list = _FIG_BG_ITEMS
+            print(_preset_menu("figure_background", figure_background))
             fig_bg_choice = input(f"│  Select background [1-{len(bg_list)}, Enter=keep current]: ").strip()
-            if fig_bg_choice:
-                try:
-                    fig_bg_idx = int(fig_bg_choice) - 1
-                    if 0 <= fig_bg_idx < len(bg_list):
-                        figure_background = bg_list[fig_bg_idx][0]
-                except (ValueError, IndexError):
-                    pass
+            choice = _parse_menu_choice(fig_bg_choice, len(bg_list), 1)
+            if choice:
+                figure_background = bg_list[choice - 1][0]
     
     # Ask if this is an SI document (for SI-specific formatting)
     is_si_choice = input("│  Apply SI formatting (S-prefixed figures/tables)? [y/N]: ").strip().lower()
@@ -2275,6 +3150,57 @@ def interactive_menu() -> Dict[str, Any]:
     }
 
 
+# --flag=value options and the config key each one sets
+_VALUE_FLAGS = {
+    "--source": "source_file",
+    "--frontmatter": "frontmatter_file",
+    "--profile": "profile",
+    "--font": "font",
+    "--fontsize": "fontsize",
+    "--csl": "citation_style",
+    "--si-file": "si_file",  # also turns on include_si_refs
+    "--linespacing": "linespacing",
+    "--paragraph-style": "paragraph_style",
+    "--lang": "language",
+    "--figure-format": "figure_format",
+    "--figure-bg": "figure_background",
+    "--papersize": "papersize",
+    "--margin-top": "margin_top",
+    "--margin-bottom": "margin_bottom",
+    "--margin-left": "margin_left",
+    "--margin-right": "margin_right",
+    "--caption-style": "caption_style",
+}
+
+# Switches (and legacy positional words) and the settings they apply
+_SWITCH_FLAGS = {
+    "--linenumbers": (("linenumbers", True),),
+    "--no-linenumbers": (("linenumbers", False),),
+    "--pagenumbers": (("pagenumbers", True),),
+    "--no-pagenumbers": (("pagenumbers", False),),
+    "--numbered-headings": (("numbered_headings", True),),
+    "--no-numbered-headings": (("numbered_headings", False),),
+    "--png": (("use_png", True),),
+    "--include-si-refs": (("include_si_refs", True),),
+    "--si": (("is_si", True),),
+    "--tex": (("tex_mode", "portable"),),
+    "--tex-portable": (("tex_mode", "portable"),),
+    "--tex-source": (("tex_mode", "source"),),
+    "--tex-body": (("tex_mode", "body"),),
+    # Flattened markdown options
+    "--flatten": (("profile", "md-flattened"),),
+    # Garden uses flattened profile by default
+    "--digital-garden": (("digital_garden", True), ("profile", "md-flattened")),
+    "--captions": (("visualize_captions", True),),
+    "--visualize-captions": (("visualize_captions", True),),
+    "--html-captions": (("caption_style", "html"),),
+    "--incremental": (("incremental", True),),
+    # Legacy support for main|si
+    "main": (("source_file", MAINTEXT),),
+    "si": (("source_file", SUPPINFO), ("is_si", True)),
+}
+
+
 def parse_arguments() -> Tuple[Optional[Dict[str, Any]], bool, bool]:
     """Parse command line arguments. Returns (config, show_list, use_last)."""
     args = sys.argv[1:]
@@ -2282,19 +3208,22 @@ def parse_arguments() -> Tuple[Optional[Dict[str, Any]], bool, bool]:
     if not args:
         return None, False, False
     
-    if "--list" in args or "-l" in args:
+    # Mode flags win over everything else; one set answers all three checks
+    flags = set(args)
+    if not flags.isdisjoint(("--list", "-l")):
         return None, True, False
     
-    if "--last" in args:
+    if "--last" in flags:
         return None, False, True
     
-    if "--help" in args or "-h" in args:
+    if not flags.isdisjoint(("--help", "-h")):
         print_help()
         sys.exit(0)
     
     # Parse explicit arguments
     config = {
         "source_file": "",
+        "source_files": [],
         "frontmatter_file": None,
         "profile": "pdf-default",
         "use_png": False,
@@ -2320,88 +3249,22 @@ def parse_arguments() -> Tuple[Optional[Dict[str, Any]], bool, bool]:
         "margin_right": None,
         "visualize_captions": None,
         "caption_style": None,
+        "incremental": False,
     }
     
     for arg in args:
-        if arg.startswith("--source="):
-            config["source_file"] = arg.split("=", 1)[1]
-        elif arg.startswith("--frontmatter="):
-            config["frontmatter_file"] = arg.split("=", 1)[1]
-        elif arg.startswith("--profile="):
-            config["profile"] = arg.split("=", 1)[1]
-        elif arg.startswith("--font="):
-            config["font"] = arg.split("=", 1)[1]
-        elif arg.startswith("--fontsize="):
-            config["fontsize"] = arg.split("=", 1)[1]
-        elif arg.startswith("--csl="):
-            config["citation_style"] = arg.split("=", 1)[1]
-        elif arg.startswith("--si-file="):
-            config["si_file"] = arg.split("=", 1)[1]
-            config["include_si_refs"] = True
-        elif arg.startswith("--linespacing="):
-            config["linespacing"] = arg.split("=", 1)[1]
-        elif arg.startswith("--paragraph-style="):
-            config["paragraph_style"] = arg.split("=", 1)[1]
-        elif arg == "--linenumbers":
-            config["linenumbers"] = True
-        elif arg == "--no-linenumbers":
-            config["linenumbers"] = False
-        elif arg == "--pagenumbers":
-            config["pagenumbers"] = True
-        elif arg == "--no-pagenumbers":
-            config["pagenumbers"] = False
-        elif arg == "--numbered-headings":
-            config["numbered_headings"] = True
-        elif arg == "--no-numbered-headings":
-            config["numbered_headings"] = False
-        elif arg.startswith("--lang="):
-            config["language"] = arg.split("=", 1)[1]
-        elif arg == "--png":
-            config["use_png"] = True
-        elif arg == "--include-si-refs":
-            config["include_si_refs"] = True
-        elif arg == "--si":
-            config["is_si"] = True
-        elif arg == "--tex":
-            config["tex_mode"] = "portable"
-        elif arg == "--tex-portable":
-            config["tex_mode"] = "portable"
-        elif arg == "--tex-source":
-            config["tex_mode"] = "source"
-        elif arg == "--tex-body":
-            config["tex_mode"] = "body"
-        # Flattened markdown options
-        elif arg == "--flatten":
-            config["profile"] = "md-flattened"
-        elif arg == "--digital-garden":
-            config["digital_garden"] = True
-            config["profile"] = "md-flattened" # Garden uses flattened profile by default
-        elif arg.startswith("--figure-format="):
-            config["figure_format"] = arg.split("=", 1)[1]
-        elif arg.startswith("--figure-bg="):
-            config["figure_background"] = arg.split("=", 1)[1]
-        elif arg.startswith("--papersize="):
-            config["papersize"] = arg.split("=", 1)[1]
-        elif arg.startswith("--margin-top="):
-            config["margin_top"] = arg.split("=", 1)[1]
-        elif arg.startswith("--margin-bottom="):
-            config["margin_bottom"] = arg.split("=", 1)[1]
-        elif arg.startswith("--margin-left="):
-            config["margin_left"] = arg.split("=", 1)[1]
-        elif arg.startswith("--margin-right="):
-            config["margin_right"] = arg.split("=", 1)[1]
-        elif arg == "--captions" or arg == "--visualize-captions":
-            config["visualize_captions"] = True
-        elif arg == "--html-captions":
-            config["caption_style"] = "html"
-        elif arg.startswith("--caption-style="):
-            config["caption_style"] = arg.split("=", 1)[1]
-        # Legacy support for main|si
-        elif arg == "main":
-            config["source_file"] = MAINTEXT
-        elif arg == "si":
-            config["source_file"] = SUPPINFO
-            config["is_si"] = True
+        flag, has_value, value = arg.partition("=")
+        if has_value:
+            key = _VALUE_FLAGS.get(flag)
+            if key:
+                config[key] = value
+                if key == "si_file":
+                    config["include_si_refs"] = True
+                elif key == "source_file":
+                    config["source_files"].append(value)
+        else:
+            for key, setting in _SWITCH_FLAGS.get(arg, ()):
+                config[key] = setting
     
     # Apply defaults for markdown/garden builds: captions ON by default
     if config.get("profile") == "md-flattened" or config.get("digital_garden"):
@@ -2416,6 +3279,9 @@ def parse_arguments() -> Tuple[Optional[Dict[str, Any]], bool, bool]:
     if config["caption_style"] is None:
         config["caption_style"] = "plain"
     
+    if config["source_files"]:
+        # The first --source names the build; later ones are built alongside
+        config["source_file"] = config["source_files"][0]
     if config["source_file"]:
         return config, False, False
     
@@ -2424,15 +3290,21 @@ def parse_arguments() -> Tuple[Optional[Dict[str, Any]], bool, bool]:
 
 def print_help():
     """Print help message."""
-    font_list = ", ".join(FONT_PRESETS.keys())
-    spacing_list = ", ".join(LINE_SPACING_PRESETS.keys())
-    para_list = ", ".join(PARAGRAPH_STYLE_PRESETS.keys())
-    lang_list = ", ".join(LANGUAGE_PRESETS.keys())
-    papersize_list = ", ".join(PAPER_SIZE_PRESETS.keys())
     # Get installed citation styles or show placeholder
     local_styles = list_local_csl_files()
     style_list = ", ".join(k for k, _, _ in local_styles) if local_styles else "install from zotero.org/styles"
-    print(f"""
+    print(_help_text(style_list))
+
+
+@functools.lru_cache(maxsize=4)
+def _help_text(style_list: str) -> str:
+    """Render the help message; only the --help path pays for it."""
+    font_list = ", ".join(FONT_PRESETS)
+    spacing_list = ", ".join(LINE_SPACING_PRESETS)
+    para_list = ", ".join(PARAGRAPH_STYLE_PRESETS)
+    lang_list = ", ".join(LANGUAGE_PRESETS)
+    papersize_list = ", ".join(PAPER_SIZE_PRESETS)
+    return f"""
 Manuscript Build System - Professional Cross-Platform Build Tool
 
 Usage:
@@ -2442,7 +3314,7 @@ Usage:
   python build.py [options]            Command-line mode
 
 Options:
-  --source=FILE              Source markdown file to build
+  --source=FILE              Source markdown file to build (repeat to build several)
   --frontmatter=FILE         Frontmatter file to prepend (optional)
   --profile=NAME             Use specific profile (e.g., --profile=pdf-nature)
   --font=NAME                Override font ({font_list})
@@ -2477,6 +3349,7 @@ Options:
   --html-captions            Use HTML <figure> tags in flattened markdown (preserves sizing/alignment)
   --list, -l                 List all available profiles
   --last                     Repeat last build configuration
+  --incremental              Skip Pandoc when the output looks up to date
   --help, -h                 Show this help message
 
   main|si                    Legacy: build 01_maintext.md or 02_supp_info.md
@@ -2484,6 +3357,7 @@ Options:
 Examples:
   python build.py --source=01_maintext.md --frontmatter=00_frontmatter.md
   python build.py --source=my_draft.md --profile=pdf-nature --csl=nature
+  python build.py --source=01_maintext.md --source=02_supp_info.md --profile=docx-manuscript
   python build.py --source=02_supp_info.md --si --profile=pdf-default
   python build.py --source=manuscript.md --profile=pdf-default --tex
   python build.py --source=manuscript.md --profile=pdf-default --tex-source
@@ -2491,25 +3365,30 @@ Examples:
   python build.py --source=manuscript.md --flatten --figure-format=png --figure-bg=white --captions
   python build.py main --profile=pdf-nature
   python build.py --last
-""")
+  python build.py --source=manuscript.md --profile=pdf-default --incremental
+"""
+
+
+@functools.lru_cache(maxsize=4)
+def _find_project_root(cwd: str) -> Optional[str]:
+    """Nearest directory at or above `cwd` that holds a .obsidian folder."""
+    base = Path(cwd)
+    for p in (base, *base.parents):
+        if (p / ".obsidian").is_dir():
+            return str(p)
+    return None
 
 
 def setup_working_directory():
     """Ensure we are running from the project root."""
-    current = Path.cwd()
-    
-    # Check if we are already in root (has .obsidian folder)
-    if (current / ".obsidian").exists():
+    # Already in root (has .obsidian folder), or in the resources dir or a
+    # subdirectory below it
+    current = os.getcwd()
+    root = _find_project_root(current)
+    if root is not None:
+        if root != current:
+            os.chdir(root)
         return
-
-    # Check if we are in resources dir or subdirectory
-    # Walk up to find .obsidian
-    p = current
-    while p != p.parent:
-        if (p / ".obsidian").exists():
-            os.chdir(p)
-            return
-        p = p.parent
     
     # Fallback: Infer from script location
     # Script is expected to be at root/resources/build.py
@@ -2567,37 +3446,43 @@ def main():
         print()
     
     # Build document or garden
+    _resolve_include.cache_clear()
     if config.get("digital_garden"):
         build_digital_garden(config["source_file"], config)
     else:
-        build_document(
-            config["source_file"],
-            config["profile"],
-            config["use_png"],
-            config["include_si_refs"],
-            config.get("frontmatter_file"),
-            config.get("font"),
-            config.get("fontsize"),
-            config.get("citation_style"),
-            config.get("si_file"),
-            config.get("is_si", False),
-            config.get("linespacing"),
-            config.get("paragraph_style"),
-            config.get("linenumbers"),
-            config.get("pagenumbers"),
-            config.get("numbered_headings"),
-            config.get("language"),
-            config.get("tex_mode"),
-            config.get("figure_format"),
-            config.get("figure_background"),
-            config.get("papersize"),
-            config.get("margin_top"),
-            config.get("margin_bottom"),
-            config.get("margin_left"),
-            config.get("margin_right"),
-            config.get("visualize_captions", False),
-            config.get("caption_style", "plain"),
+        options = dict(
+            frontmatter_file=config.get("frontmatter_file"),
+            font=config.get("font"),
+            fontsize=config.get("fontsize"),
+            citation_style=config.get("citation_style"),
+            si_file=config.get("si_file"),
+            is_si=config.get("is_si", False),
+            linespacing=config.get("linespacing"),
+            paragraph_style=config.get("paragraph_style"),
+            linenumbers=config.get("linenumbers"),
+            pagenumbers=config.get("pagenumbers"),
+            numbered_headings=config.get("numbered_headings"),
+            language=config.get("language"),
+            tex_mode=config.get("tex_mode"),
+            figure_format=config.get("figure_format"),
+            figure_background=config.get("figure_background"),
+            papersize=config.get("papersize"),
+            margin_top=config.get("margin_top"),
+            margin_bottom=config.get("margin_bottom"),
+            margin_left=config.get("margin_left"),
+            margin_right=config.get("margin_right"),
+            visualize_captions=config.get("visualize_captions", False),
+            caption_style=config.get("caption_style", "plain"),
+            incremental=config.get("incremental", False),
         )
+        # Several --source flags build all documents with the same options
+        source_files = config.get("source_files") or [config["source_file"]]
+        if len(source_files) > 1:
+            build_many(source_files, config["profile"], config["use_png"],
+                       config["include_si_refs"], **options)
+        else:
+            build_document(config["source_file"], config["profile"], config["use_png"],
+                           config["include_si_refs"], **options)
     
     print()
     print("✓ Build complete!")